@@ -1,89 +1,96 @@
 # -*- coding: utf-8 -*-
 """
 buffguild - VK Buff Guild Bot
-"""
 
-from .token_handler import TokenHandler
-from .token_manager import OptimizedTokenManager
-from .executor import AbilityExecutor
-from .observer_main import ObserverBot
-from .scheduler import Scheduler
-from .health import TokenHealthMonitor
-from .profile_manager import ProfileManager
-from .telegram_admin import TelegramAdmin
-from .vk_client import ResilientVKClient
-from .group_handler import GroupHandler, GroupProxy
-from .models import Job, ParsedAbility
-from .commands import (
-    parse_baf_letters,
-    parse_golosa_cmd,
-    parse_doprasa_cmd,
-    parse_resurrection_cmd,
-    is_resurrection_cmd,
-    is_apo_cmd,
-    is_baf_cancel_cmd,
-    is_prof_cmd,
-)
-from .regexes import (
-    RE_SUCCESS,
-    RE_ALREADY,
-    RE_NOT_APOSTLE,
-    RE_NO_VOICES,
-    RE_COOLDOWN,
-    RE_REMAINING_SEC,
-    RE_VOICES_GENERIC,
-    RE_VOICES_ANY,
-    RE_VOICES_IN_PARENTHESES,
-    RE_PROFILE_LEVEL,
-    RE_NOT_APOSTLE_OF_RACE,
-    RE_ALREADY_BUFF,
-    RE_OTHER_RACE,
-    RE_ALREADY_RACE,
-    RE_REQUIRES_ANCIENT_VOICE,
-    RE_RESURRECTION,
-    RE_RESURRECTION_SUCCESS,
-    RE_CLEANSE,
-)
-from .notifications import (
-    build_registration_text,
-    build_final_text
-)
-from .constants import (
-    CLASS_ORDER,
-    CLASS_ABILITIES,
-    RACE_NAMES,
-    RACE_EMOJIS,
-    VK_API_BASE,
-    VK_API_VERSION,
-    RESURRECTION_CONFIG,
-    SYSTEM_VERSION,
-    SYSTEM_FEATURES,
-    TEMP_RACE_SAFETY_MARGIN,
-    TEMP_RACE_DURATION_HOURS,
-    TEMP_RACE_CLEANUP_INTERVAL,
-    TURBO_MODE_CONFIG,
-    VOICE_PROPHET_CONFIG,
-)
-from .utils import (
-    jitter_sleep,
-    normalize_text,
-    timestamp_to_moscow,
-    now_moscow,
-    format_moscow_time,
-    now_ts
-)
-from .validators import InputValidator
-from .ability import build_ability_text_and_cd
-from .job_storage import JobStorage
-from .state_store import JobStateStore
-from .logging_setup import setup_logging
-from .custom_triggers import trigger_store, custom_storage
-from .observer_triggers import CustomTriggerHandler  # ← ИЗМЕНЕНО: SimpleTriggerHandler → CustomTriggerHandler
-from .voice_prophet import VoiceProphet
+Публичные имена подгружаются лениво (PEP 562): подмодуль импортируется
+при первом обращении к атрибуту пакета, а не при `import buffguild`.
+"""
+import importlib
 
 __version__ = "3.1.0"
 __author__ = "Buff Guild Team"
 
+# Имя → подмодуль, из которого оно реэкспортируется
+_LAZY = {
+    'TokenHandler': '.token_handler',
+    'OptimizedTokenManager': '.token_manager',
+    'AbilityExecutor': '.executor',
+    'ObserverBot': '.observer_main',
+    'Scheduler': '.scheduler',
+    'TokenHealthMonitor': '.health',
+    'ProfileManager': '.profile_manager',
+    'TelegramAdmin': '.telegram_admin',
+    'ResilientVKClient': '.vk_client',
+    'GroupHandler': '.group_handler',
+    'GroupProxy': '.group_handler',
+    'Job': '.models',
+    'ParsedAbility': '.models',
+    'CustomBuff': '.models',
+    'TriggerState': '.models',
+    'classify': '.commands',
+    'parse_baf_letters': '.commands',
+    'parse_golosa_cmd': '.commands',
+    'parse_doprasa_cmd': '.commands',
+    'parse_resurrection_cmd': '.commands',
+    'is_resurrection_cmd': '.commands',
+    'is_apo_cmd': '.commands',
+    'is_baf_cancel_cmd': '.commands',
+    'is_prof_cmd': '.commands',
+    'RE_SUCCESS': '.regexes',
+    'RE_ALREADY': '.regexes',
+    'RE_NOT_APOSTLE': '.regexes',
+    'RE_NO_VOICES': '.regexes',
+    'RE_COOLDOWN': '.regexes',
+    'RE_REMAINING_SEC': '.regexes',
+    'RE_VOICES_GENERIC': '.regexes',
+    'RE_VOICES_ANY': '.regexes',
+    'RE_VOICES_IN_PARENTHESES': '.regexes',
+    'RE_PROFILE_LEVEL': '.regexes',
+    'RE_NOT_APOSTLE_OF_RACE': '.regexes',
+    'RE_ALREADY_BUFF': '.regexes',
+    'RE_OTHER_RACE': '.regexes',
+    'RE_ALREADY_RACE': '.regexes',
+    'RE_REQUIRES_ANCIENT_VOICE': '.regexes',
+    'RE_RESURRECTION': '.regexes',
+    'RE_RESURRECTION_SUCCESS': '.regexes',
+    'RE_CLEANSE': '.regexes',
+    'classify_response': '.regexes',
+    'extract_voices': '.regexes',
+    'build_registration_text': '.notifications',
+    'build_final_text': '.notifications',
+    'CLASS_ORDER': '.constants',
+    'CLASS_ABILITIES': '.constants',
+    'ALL_ABILITY_LETTERS': '.constants',
+    'RACE_NAMES': '.constants',
+    'RACE_TEXT_TO_KEY': '.constants',
+    'RACE_EMOJIS': '.constants',
+    'VK_API_BASE': '.constants',
+    'VK_API_VERSION': '.constants',
+    'RESURRECTION_CONFIG': '.constants',
+    'SYSTEM_VERSION': '.constants',
+    'SYSTEM_FEATURES': '.constants',
+    'TEMP_RACE_SAFETY_MARGIN': '.constants',
+    'TEMP_RACE_DURATION_HOURS': '.constants',
+    'TEMP_RACE_CLEANUP_INTERVAL': '.constants',
+    'TURBO_MODE_CONFIG': '.constants',
+    'VOICE_PROPHET_CONFIG': '.constants',
+    'jitter_sleep': '.utils',
+    'normalize_text': '.utils',
+    'timestamp_to_moscow': '.utils',
+    'now_moscow': '.utils',
+    'format_moscow_time': '.utils',
+    'now_ts': '.utils',
+    'InputValidator': '.validators',
+    'build_ability_text_and_cd': '.ability',
+    'JobStorage': '.job_storage',
+    'JobStateStore': '.state_store',
+    'setup_logging': '.logging_setup',
+    'trigger_store': '.custom_triggers',
+    'custom_storage': '.custom_triggers',
+    'CustomTriggerHandler': '.observer_triggers',  # ← ИЗМЕНЕНО: SimpleTriggerHandler → CustomTriggerHandler
+    'VoiceProphet': '.voice_prophet',
+}
+
 __all__ = [
     'TokenHandler',
     'OptimizedTokenManager',
@@ -98,6 +105,8 @@ __all__ = [
     'GroupProxy',
     'Job',
     'ParsedAbility',
+    'CustomBuff',
+    'TriggerState',
     'JobStorage',
     'JobStateStore',
     'VoiceProphet',
@@ -105,6 +114,7 @@ __all__ = [
     'trigger_store',
     'custom_storage',
     'setup_logging',
+    'classify',
     'parse_baf_letters',
     'parse_golosa_cmd',
     'parse_doprasa_cmd',
@@ -125,7 +135,9 @@ __all__ = [
     'now_ts',
     'CLASS_ORDER',
     'CLASS_ABILITIES',
+    'ALL_ABILITY_LETTERS',
     'RACE_NAMES',
+    'RACE_TEXT_TO_KEY',
     'RACE_EMOJIS',
     'VK_API_BASE',
     'VK_API_VERSION',
@@ -155,4 +167,20 @@ __all__ = [
     'RE_RESURRECTION',
     'RE_RESURRECTION_SUCCESS',
     'RE_CLEANSE',
+    'classify_response',
+    'extract_voices',
 ]
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    obj = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = obj
+    return obj
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -7,38 +7,102 @@ from __future__ import annotations
 import re
 from typing import Any, Dict, Optional, Tuple
 
-from .constants import CLASS_ABILITIES
+from .constants import ALL_ABILITY_LETTERS
 from .validators import InputValidator
 from .utils import normalize_text
 
+# Все допустимые буквы способностей (объединение по всем классам)
+_ALLOWED_BAF_LETTERS = ALL_ABILITY_LETTERS
 
-def parse_baf_letters(text: str) -> str:
+
+class _KeepOnlyTable(dict):
+    """Таблица для str.translate: разрешённые символы остаются, остальные удаляются."""
+
+    def __missing__(self, key: int) -> None:
+        return None
+
+
+_BAF_LETTERS_TABLE = _KeepOnlyTable((ord(ch), ord(ch)) for ch in _ALLOWED_BAF_LETTERS)
+
+# Префикс команды → тип команды (для classify)
+_COMMAND_KINDS: Dict[str, str] = {
+    "/баф": "baf",
+    "/апо": "apo",
+    "/проф": "prof",
+    "/голоса": "golosa",
+    "/допраса": "doprasa",
+    "/воскрешение": "res",
+    "/диагностика": "diag",
+    "/сменарасы": "change_races",
+    "/здоровье": "health",
+    "/health": "health",
+    "/статус": "health",
+}
+
+# Одна альтернация вместо цепочки startswith; длинные префиксы первыми
+_RE_COMMAND_PREFIX = re.compile(
+    "|".join(
+        re.escape(p) for p in sorted(_COMMAND_KINDS, key=len, reverse=True)
+    )
+)
+
+
+_COMMAND_PREFIXES: Tuple[str, ...] = tuple(_COMMAND_KINDS)
+
+# Аргументы команд одним fullmatch вместо split() + strip() каждой части.
+# \S* после префикса — как раньше с split(): '/голосаX 5' тоже проходит.
+# Число — как принимал int(): со знаком и ведущими нулями.
+_RE_GOLOSA_ARGS = re.compile(r"/голоса\S*\s+([+-]?\d+)")
+_RE_RESURRECTION_ARGS = re.compile(r"/воскрешение\S*\s+([+-]?\d+)")
+_RE_DOPRASA_ARGS = re.compile(r"/допраса\S*\s+(\S+)(?:\s+(\S+))?", re.IGNORECASE)
+
+
+def classify(text: str) -> Tuple[str, str]:
+    """
+    Нормализует текст один раз и определяет тип команды по префиксу.
+
+    Returns:
+        (kind, norm): kind — тип команды из _COMMAND_KINDS или "" если
+        текст не начинается ни с одного известного префикса.
+    """
+    if text and text[0] == "/" and not text[-1].isspace():
+        # Частый случай: команда набрана как есть, strip не нужен
+        norm = text if text.islower() else text.lower()
+    else:
+        norm = normalize_text(text or "")
+    if not norm.startswith(_COMMAND_PREFIXES):
+        return "", norm
+    m = _RE_COMMAND_PREFIX.match(norm)
+    if not m:
+        return "", norm
+    return _COMMAND_KINDS[m.group(0)], norm
+
+
+# Парсеры ниже принимают norm — текст, уже нормализованный classify()
+# (или normalize_text), и повторно его не нормализуют.
+
+
+def parse_baf_letters(norm: str) -> str:
     """Parse '!баф ...' and return up to 4 valid ability letters, or ''."""
-    text_n = normalize_text(text or "")
-    if not text_n.startswith("/баф"):
+    if not norm.startswith("/баф"):
         return ""
 
-    s = text_n[4:].strip()
+    s = norm[4:].strip()
     if not s:
         return ""
 
     s = s[:4]
 
-    allowed = set()
-    for cls in CLASS_ABILITIES.values():
-        allowed.update(cls["abilities"].keys())
-
-    out = "".join(ch for ch in s if ch in allowed)
+    out = s.translate(_BAF_LETTERS_TABLE)
     return out[:4]
 
 
-def is_apo_cmd(text: str) -> bool:
-    return normalize_text(text or "").startswith("/апо")
+def is_apo_cmd(norm: str) -> bool:
+    return norm.startswith("/апо")
 
 
-def is_baf_cancel_cmd(text: str) -> bool:
+def is_baf_cancel_cmd(norm: str) -> bool:
     """Проверяет, является ли текст командой отмены бафа"""
-    norm = normalize_text(text or "")
     cancel_variants = [
         "/баф отмена",
         "/баф отменить",
@@ -47,52 +111,48 @@ def is_baf_cancel_cmd(text: str) -> bool:
     return norm in cancel_variants
 
 
-def is_prof_cmd(text: str) -> bool:
+def is_prof_cmd(norm: str) -> bool:
     """Проверяет, является ли текст командой проверки профиля"""
-    norm = normalize_text(text or "")
     return norm.startswith("/проф")
 
 
-def parse_golosa_cmd(text: str) -> Optional[Tuple[None, int]]:
+def parse_golosa_cmd(norm: str) -> Optional[Tuple[None, int]]:
     """Parse '!голоса N' -> (None, n) or None."""
-    t = (text or "").strip()
-    if not normalize_text(t).startswith("/голоса"):
+    m = _RE_GOLOSA_ARGS.fullmatch(norm)
+    if not m:
         return None
 
-    parts = t.split()
-    if len(parts) != 2:
-        return None
-
-    try:
-        n = int(parts[1].strip())
-    except Exception:
-        return None
-
-    return None, max(0, n)
+    return None, max(0, int(m.group(1)))
 
 
 def parse_doprasa_cmd(
     text: str,
     msg_item: Dict[str, Any],
+    norm: str,
 ) -> Optional[Tuple[str, Optional[str], Optional[int], str]]:
-    """Parse '/допраса [race] [token_name?]'."""
-    t = InputValidator.sanitize_text(text or "", max_length=50)
-    if not normalize_text(t).startswith("/допраса"):
+    """
+    Parse '/допраса [race] [token_name?]'.
+
+    text — исходный текст (имя токена сохраняет регистр), norm — он же после classify().
+    """
+    # Дешёвая проверка префикса до sanitize_text (regex-замены + html.escape)
+    if not norm.startswith("/допраса"):
         return None
 
-    parts = t.split()
-    if len(parts) < 2 or len(parts) > 3:
+    # После удаления опасных подстрок по краям может остаться пробел
+    t = InputValidator.sanitize_text(text or "", max_length=50).strip()
+
+    m = _RE_DOPRASA_ARGS.fullmatch(t)
+    if not m:
         return None
 
-    race = parts[1].strip().lower()
+    race = m.group(1).lower()
     if not InputValidator.validate_race_key(race):
         return None
 
-    token_name: Optional[str] = None
-    if len(parts) == 3:
-        token_name = parts[2].strip()
-        if not InputValidator.validate_token_name(token_name):
-            return None
+    token_name: Optional[str] = m.group(2)
+    if token_name is not None and not InputValidator.validate_token_name(token_name):
+        return None
 
     original_timestamp: Optional[int] = None
     if "reply_message" in msg_item:
@@ -108,34 +168,27 @@ def parse_doprasa_cmd(
 
 
 # ============= ПАРСИНГ КОМАНДЫ /ВОСКРЕШЕНИЕ =============
-def parse_resurrection_cmd(text: str) -> Optional[int]:
+def parse_resurrection_cmd(norm: str) -> Optional[int]:
     """
     Парсит команду '/воскрешение [уровень]'
     
     Args:
-        text: текст команды (например, "/воскрешение 25")
+        norm: нормализованный текст команды (например, "/воскрешение 25")
         
     Returns:
         int: уровень цели, или None если неверный формат
     """
-    t = (text or "").strip()
-    if not normalize_text(t).startswith("/воскрешение"):
+    m = _RE_RESURRECTION_ARGS.fullmatch(norm)
+    if not m:
         return None
-    
-    parts = t.split()
-    if len(parts) != 2:
-        return None
-    
-    try:
-        level = int(parts[1].strip())
-        if level < 1 or level > 1000:
-            return None
-        return level
-    except ValueError:
+
+    level = int(m.group(1))
+    if level < 1 or level > 1000:
         return None
+    return level
 
 
-def is_resurrection_cmd(text: str) -> bool:
+def is_resurrection_cmd(norm: str) -> bool:
     """Проверяет, является ли текст командой воскрешения"""
-    return normalize_text(text or "").startswith("/воскрешение")
+    return norm.startswith("/воскрешение")
 # =========================================================
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
-from typing import Any, Dict
+import sys
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
 
 
 VK_API_BASE = "https://api.vk.com/method"
@@ -22,6 +24,15 @@ RACE_NAMES = {
 }
 
 
+# Название расы в тексте ответа игры → символ расы
+RACE_TEXT_TO_KEY = {
+    "человек": "ч", "гоблин": "г", "нежить": "н",
+    "эльф": "э", "гном": "м", "демон": "д", "орк": "о",
+    "людей": "ч", "гоблинов": "г", "нежити": "н",
+    "эльфов": "э", "гномов": "м", "демонов": "д", "орков": "о",
+}
+
+
 # Символ → эмодзи расы (единый источник истины)
 RACE_EMOJIS = {
     "ч": "🧍",  # человек
@@ -35,7 +46,7 @@ RACE_EMOJIS = {
 
 
 # Описание классов и их способностей
-CLASS_ABILITIES: Dict[str, Dict[str, Any]] = {
+CLASS_ABILITIES: Dict[str, Mapping[str, Any]] = {
     "apostle": {
         "name": "Апостол",
         "prefix": "благословение",
@@ -98,6 +109,51 @@ CLASS_ABILITIES: Dict[str, Dict[str, Any]] = {
     },
 }
 
+
+def _build_ability_lookup() -> Dict[Tuple[str, str], Tuple[str, int, bool]]:
+    """(class_type, key) → (text, cooldown, uses_voices), считается один раз при импорте."""
+    lookup: Dict[Tuple[str, str], Tuple[str, int, bool]] = {}
+    for class_type, c in CLASS_ABILITIES.items():
+        uses_voices = bool(c.get("uses_voices", False))
+        prefix = c.get("prefix", "")
+        for key, v in c["abilities"].items():
+            lookup_key = (class_type, sys.intern(key))
+            if isinstance(v, tuple):
+                text, cd = str(v[0]), int(v[1])
+            else:
+                text = f"{prefix} {v}".strip() if prefix else str(v)
+                cd = int(c.get("default_cooldown", 61))
+            # Один общий кортеж на способность: вызов не создаёт новых объектов
+            lookup[lookup_key] = (sys.intern(text), cd, uses_voices)
+    return lookup
+
+
+# Плоская таблица способностей для build_ability_text_and_cd
+ABILITY_LOOKUP: Dict[Tuple[str, str], Tuple[str, int, bool]] = _build_ability_lookup()
+
+# Однобуквенные кириллические ключи CPython не интернирует сам;
+# интернированные ключи сравниваются в dict по идентичности
+RACE_NAMES = {sys.intern(k): v for k, v in RACE_NAMES.items()}
+RACE_EMOJIS = {sys.intern(k): v for k, v in RACE_EMOJIS.items()}
+RACE_TEXT_TO_KEY = {k: sys.intern(v) for k, v in RACE_TEXT_TO_KEY.items()}
+
+# Описание классов только для чтения: случайная мутация таблицы
+# разошлась бы с ABILITY_LOOKUP.
+# "_letters" — буквы способностей класса для проверок принадлежности
+for _class_type, _c in list(CLASS_ABILITIES.items()):
+    _abilities = {sys.intern(k): v for k, v in _c["abilities"].items()}
+    CLASS_ABILITIES[_class_type] = MappingProxyType({
+        **_c,
+        "abilities": MappingProxyType(_abilities),
+        "_letters": frozenset(_abilities),
+    })
+del _class_type, _c, _abilities
+
+# Все буквы способностей по всем классам
+ALL_ABILITY_LETTERS = frozenset().union(
+    *(c["_letters"] for c in CLASS_ABILITIES.values())
+)
+
 SYSTEM_VERSION = "3.0.0"
 SYSTEM_FEATURES = {
     "voice_prophet": True,    # Интеллектуальный предсказатель голосов
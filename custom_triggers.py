@@ -5,8 +5,11 @@
 import time
 import logging
 import threading
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Any
 
+from .models import CustomBuff, TriggerState
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,9 +18,15 @@ class SimpleTriggerStore:
     
     def __init__(self):
         self._lock = threading.RLock()
+        # Будит потоки ожидания Ара/Кир при новом ответе или удалении триггера
+        self._changed = threading.Condition(self._lock)
         # Структура: {user_id: [триггер1, триггер2, ...]}
-        self._triggers: Dict[int, List[Dict]] = {}
-        self._processed_msgs = set()
+        self._triggers: Dict[int, List[TriggerState]] = {}
+        # Отдельная блокировка дедупликации: проверка ответа игры не ждёт
+        # потоки ожидания Ара/Кир, которые держат _lock при опросе триггеров
+        self._processed_lock = threading.Lock()
+        # Обработанные msg_id в порядке добавления (старые в начале)
+        self._processed_msgs: "OrderedDict[int, None]" = OrderedDict()
         self._max_processed = 10000
 
     def register_trigger(self, user_id: int, buff_keys: List[str], executor_id: int) -> int:
@@ -29,18 +38,15 @@ class SimpleTriggerStore:
             if user_id not in self._triggers:
                 self._triggers[user_id] = []
             
-            trigger = {
-                'buff_keys': buff_keys.copy(),
-                'responses': [],  # список полученных бафов
-                'responses_full': [],  # список кортежей (buff_key, is_critical, buff_value)
-                'completed': False,
-                'created_at': time.time(),
-                'executor_id': executor_id
-            }
+            trigger = TriggerState(
+                buff_keys=tuple(buff_keys),
+                executor_id=executor_id,
+                created_at=time.monotonic(),
+            )
             self._triggers[user_id].append(trigger)
             trigger_index = len(self._triggers[user_id]) - 1
             
-            logger.info(f"📝 Триггер #{trigger_index} для {user_id}: {buff_keys} (исполнитель: {executor_id})")
+            logger.info("📝 Триггер #%s для %s: %s (исполнитель: %s)", trigger_index, user_id, buff_keys, executor_id)
             return trigger_index
 
     def add_response(self, user_id: int, trigger_index: int, buff_key: str, is_critical: bool = False, buff_value: int = 100) -> Tuple[bool, int]:
@@ -50,49 +56,76 @@ class SimpleTriggerStore:
         """
         with self._lock:
             if user_id not in self._triggers:
-                logger.debug(f"⚠️ Нет триггеров для {user_id}")
+                logger.debug("⚠️ Нет триггеров для %s", user_id)
                 return False, 0
             
             if trigger_index >= len(self._triggers[user_id]):
-                logger.debug(f"⚠️ Нет триггера #{trigger_index} для {user_id}")
+                logger.debug("⚠️ Нет триггера #%s для %s", trigger_index, user_id)
                 return False, 0
             
             trigger = self._triggers[user_id][trigger_index]
             
-            if trigger['completed']:
-                logger.debug(f"⏭️ Триггер #{trigger_index} уже завершён")
-                return False, len(trigger['responses'])
+            if trigger.completed:
+                logger.debug("⏭️ Триггер #%s уже завершён", trigger_index)
+                return False, len(trigger.responses)
             
             # Проверка на дубликат
-            if buff_key in trigger['responses']:
-                logger.debug(f"⏭️ Дубль бафа {buff_key} в триггере #{trigger_index}")
-                return False, len(trigger['responses'])
+            if buff_key in trigger.responses:
+                logger.debug("⏭️ Дубль бафа %s в триггере #%s", buff_key, trigger_index)
+                return False, len(trigger.responses)
             
             # Добавляем ответ
-            trigger['responses'].append(buff_key)
-            trigger['responses_full'].append((buff_key, is_critical, buff_value))
+            trigger.responses[buff_key] = CustomBuff(buff_key, is_critical, buff_value)
             
-            current = len(trigger['responses'])
-            total = len(trigger['buff_keys'])
+            current = len(trigger.responses)
+            total = len(trigger.buff_keys)
             
-            crit_str = "КРИТ" if is_critical else "обычный"
-            logger.info(f"✅ Триггер #{trigger_index}: получен {buff_key} ({current}/{total}) [{crit_str}, {buff_value}]")
+            logger.info(
+                "✅ Триггер #%s: получен %s (%s/%s) [%s, %s]",
+                trigger_index, buff_key, current, total,
+                "КРИТ" if is_critical else "обычный", buff_value,
+            )
             
             all_collected = current >= total
             if all_collected:
-                trigger['completed'] = True
-                logger.info(f"🎉 Триггер #{trigger_index} для {user_id} полностью собран!")
-            
+                trigger.completed = True
+                logger.info("🎉 Триггер #%s для %s полностью собран!", trigger_index, user_id)
+
+            self._changed.notify_all()
             return all_collected, current
 
-    def get_trigger(self, user_id: int, trigger_index: int) -> Optional[Dict]:
-        """Возвращает данные триггера"""
+    def has_triggers(self, user_id: int) -> bool:
+        """Ждёт ли пользователь хотя бы один баф Ара/Кир"""
         with self._lock:
-            if user_id not in self._triggers:
-                return None
-            if trigger_index >= len(self._triggers[user_id]):
-                return None
-            return self._triggers[user_id][trigger_index].copy()
+            return user_id in self._triggers
+
+    def _count_locked(self, user_id: int, trigger_index: int) -> Optional[int]:
+        triggers = self._triggers.get(user_id)
+        if not triggers or trigger_index >= len(triggers):
+            return None
+        return len(triggers[trigger_index].responses)
+
+    def count_responses(self, user_id: int, trigger_index: int) -> Optional[int]:
+        """Сколько бафов уже получено (None — триггера нет)"""
+        with self._lock:
+            return self._count_locked(user_id, trigger_index)
+
+    def wait_for_responses(self, user_id: int, trigger_index: int, need: int, timeout: float) -> Optional[int]:
+        """
+        Блокируется, пока триггер не соберёт need бафов, не будет удалён
+        или не истечёт timeout. Возвращает число полученных бафов
+        (None — триггера уже нет).
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                count = self._count_locked(user_id, trigger_index)
+                if count is None or count >= need:
+                    return count
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return count
+                self._changed.wait(remaining)
 
     def get_responses(self, user_id: int, trigger_index: int) -> List[Tuple[str, int, bool, int]]:
         """
@@ -105,9 +138,12 @@ class SimpleTriggerStore:
                 return []
             
             trigger = self._triggers[user_id][trigger_index]
-            executor_id = trigger['executor_id']
+            executor_id = trigger.executor_id
             
-            return [(key, executor_id, crit, val) for key, crit, val in trigger['responses_full']]
+            return [
+                (buff.buff_key, executor_id, buff.is_critical, buff.buff_value)
+                for buff in trigger.responses.values()
+            ]
 
     def complete_trigger(self, user_id: int, trigger_index: int):
         """Удаляет триггер"""
@@ -115,20 +151,27 @@ class SimpleTriggerStore:
             if user_id in self._triggers:
                 if trigger_index < len(self._triggers[user_id]):
                     self._triggers[user_id].pop(trigger_index)
-                    logger.info(f"🗑️ Триггер #{trigger_index} для {user_id} удалён")
+                    logger.info("🗑️ Триггер #%s для %s удалён", trigger_index, user_id)
                     
                     # Если не осталось триггеров - удаляем пользователя
                     if not self._triggers[user_id]:
                         del self._triggers[user_id]
-                        logger.info(f"🗑️ Пользователь {user_id} удалён из хранилища")
+                        logger.info("🗑️ Пользователь %s удалён из хранилища", user_id)
+
+                    self._changed.notify_all()
 
     def is_msg_processed(self, msg_id: int) -> bool:
-        return msg_id in self._processed_msgs
+        with self._processed_lock:
+            return msg_id in self._processed_msgs
 
     def mark_msg_processed(self, msg_id: int):
-        self._processed_msgs.add(msg_id)
-        if len(self._processed_msgs) > self._max_processed:
-            self._processed_msgs = set(list(self._processed_msgs)[-5000:])
+        with self._processed_lock:
+            processed = self._processed_msgs
+            processed[msg_id] = None
+            processed.move_to_end(msg_id)
+            # Сверх лимита вытесняем самые старые записи
+            while len(processed) > self._max_processed:
+                processed.popitem(last=False)
 
 
 # Создаём глобальный экземпляр
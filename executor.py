@@ -3,58 +3,104 @@ import logging
 import re
 import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Pattern, Tuple
 
 from .constants import RACE_NAMES
 from .regexes import (
-    RE_SUCCESS,
-    RE_ALREADY,
-    RE_NOT_APOSTLE,
-    RE_NO_VOICES,
-    RE_COOLDOWN,
     RE_REMAINING_SEC,
-    RE_VOICES_GENERIC,
-    RE_VOICES_ANY,
-    RE_VOICES_IN_PARENTHESES,
     RE_PROFILE_LEVEL,
-    RE_NOT_APOSTLE_OF_RACE,
-    RE_ALREADY_BUFF,
-    RE_OTHER_RACE,
-    RE_ALREADY_RACE,
-    RE_REQUIRES_ANCIENT_VOICE,
-    RE_RESURRECTION,
-    RE_RESURRECTION_SUCCESS,
-    RE_CLEANSE,
+    classify_response,
+    extract_voices,
 )
 from .token_handler import TokenHandler
+from .utils import normalize_text
 from .models import ParsedAbility, Job
 
 logger = logging.getLogger(__name__)
 
+# Паттерн статуса → (статус для execute_one, метка для лога)
+_STATUS_BY_PATTERN: Dict[str, Tuple[str, str]] = {
+    "RE_NOT_APOSTLE_OF_RACE": ("PASS_TO_NEXT_APOSTLE", "NOT_APOSTLE_OF_RACE"),
+    "RE_ALREADY_BUFF": ("ALREADY_BUFF", "ALREADY_BUFF"),
+    "RE_OTHER_RACE": ("PASS_TO_NEXT_APOSTLE", "OTHER_RACE"),
+    "RE_ALREADY_RACE": ("ALREADY_BUFF", "ALREADY_BUFF"),
+    "RE_REQUIRES_ANCIENT_VOICE": ("NO_VOICES", "NO_VOICES - требуется Голос Древних"),
+    "RE_NO_VOICES": ("NO_VOICES", "NO_VOICES"),
+    "RE_NOT_APOSTLE": ("NOT_APOSTLE", "NOT_APOSTLE"),
+    "RE_ALREADY": ("ALREADY", "ALREADY"),
+    "RE_COOLDOWN": ("COOLDOWN", "COOLDOWN"),
+    "RE_RESURRECTION_SUCCESS": ("SUCCESS", "RESURRECTION_SUCCESS"),
+    "RE_RESURRECTION": ("SUCCESS", "RESURRECTION_SUCCESS"),
+    "RE_CLEANSE": ("SUCCESS", "CLEANSE_SUCCESS"),
+    "RE_SUCCESS": ("SUCCESS", "SUCCESS"),
+}
+
+# Паттерны разбора значения бафа (компилируются один раз при импорте)
+_RE_LUCK = re.compile(r"удача\s+повышена\s+на\s+(\d{1,3})")
+# Процент проклятия: порядок важен, первый найденный паттерн побеждает
+_CURSE_PERCENT_RES: Tuple[Pattern[str], ...] = tuple(re.compile(p) for p in (
+    r"уменьшена на\s+(\d{1,3})\s*%",
+    r"увеличена на\s+(\d{1,3})\s*%",
+    r"на\s+(\d{1,3})\s*%",
+    r"(\+?\d{1,3})\s*%",
+))
+# Процент бафа. Прежний список из восьми паттернов начинался с «N%», который
+# находится в любом тексте, где находятся остальные, — они не срабатывали никогда
+_RE_BUFF_PERCENT = re.compile(r"(\+?\d{1,3})\s*%", re.IGNORECASE)
+
+# Расовые бафы: все ключевые слова одним проходом по тексту
+_RACE_KEYWORDS = (
+    "человек", "гоблин", "нежить", "эльф", "гном", "демон", "орк",
+    "людей", "гоблинов", "нежити", "эльфов", "гномов", "демонов", "орков",
+)
+_RE_RACE_KEYWORD = re.compile("|".join(map(re.escape, _RACE_KEYWORDS)))
+
+# Без хотя бы одного из этих маркеров значение бафа всегда 100 без крита:
+# крит даёт только 🍀, «критическ…», 30% или «удача повышена на 9»
+_VALUE_MARKERS = ("🍀", "%", "критическ", "удача")
+
+# Признаки текста с результатом действия (ищутся в тексте в нижнем регистре)
+_RE_RESULT_MARKER = re.compile(
+    "[🌀✨☀🍀]|на вас наложено|уменьшена на|увеличена на|повышена на|воскресить|воскрешение"
+)
+
+# Первая пауза опроса ответа игры; множитель роста пауз при ожидании профиля
+_FIRST_POLL_DELAY = 0.5
+_POLL_BACKOFF = 1.5
+# Предел ожидания ответа на «Мой профиль», секунды
+_PROFILE_WAIT = 3.0
+
 
 class AbilityExecutor:
     def __init__(self, tm):
         self.tm = tm
         self._target_lock: Dict[int, threading.Lock] = {}
+        # Защищает только создание блокировки цели (медленный путь)
+        self._target_lock_guard = threading.Lock()
 
     def _lock_for_target(self, peer_id: int) -> threading.Lock:
-        if peer_id not in self._target_lock:
-            self._target_lock[peer_id] = threading.Lock()
-        return self._target_lock[peer_id]
+        lock = self._target_lock.get(peer_id)
+        if lock is None:
+            with self._target_lock_guard:
+                lock = self._target_lock.setdefault(peer_id, threading.Lock())
+        return lock
 
     def find_trigger_in_token_source(self, token: TokenHandler, job: Job) -> Tuple[Optional[int], Optional[int]]:
-        want_text = (job.trigger_text or "").strip().lower()
+        want_text = job.trigger_norm
         if not want_text:
             return None, None
 
+        # messages.getHistory отдаёт историю от новых к старым: первым
+        # находится самый свежий триггер отправителя
+        sender_id = job.sender_id
         msgs = token.get_history_cached(token.source_peer_id, count=30)
         for m in msgs:
-            from_id = int(m.get("from_id", 0))
-            if from_id != job.sender_id:
+            if m.get("from_id", 0) != sender_id:
                 continue
-            txt = (m.get("text", "") or "").strip().lower()
+            # Кэшированная нормализация: история source_peer_id между опросами почти не меняется
+            txt = normalize_text(m.get("text", ""))
             if txt == want_text:
-                mid = int(m.get("id", 0))
+                mid = m.get("id", 0)
                 cmid = m.get("conversation_message_id")
                 cmid_int = (
                     int(cmid)
@@ -74,17 +120,20 @@ class AbilityExecutor:
         cooldown_hint = False
         full_response_text = ""
 
-        logger.debug(f"🔍 Начало парсинга {len(msgs)} сообщений")
+        logger.debug("🔍 Начало парсинга %s сообщений", len(msgs))
 
-        # Собираем ВСЕ тексты для анализа
-        all_texts = []
+        # Один проход: текст каждого сообщения нормализуется один раз,
+        # remaining/голоса/кандидаты результата/статус собираются вместе
+        best_text = ""   # самый длинный кандидат в текст результата
+        last_text = None
+        found = None
 
         for m in msgs:
             text = str(m.get("text", "")).strip()
             text_l = text.lower()
-            logger.debug(f"📝 Сообщение для парсинга: {text[:100]}...")
+            logger.debug("📝 Сообщение для парсинга: %.100s...", text)
 
-            all_texts.append(text)
+            last_text = text
 
             mm = RE_REMAINING_SEC.search(text)
             if mm:
@@ -92,136 +141,40 @@ class AbilityExecutor:
                     remaining = int(mm.group(1))
                     if "социальные эффекты" in text_l:
                         cooldown_hint = True
-                    logger.debug(f"⏰ Нашли remaining: {remaining}")
+                    logger.debug("⏰ Нашли remaining: %s", remaining)
                 except Exception as e:
-                    logger.error(f"❌ Ошибка парсинга remaining: {e}")
+                    logger.error("❌ Ошибка парсинга remaining: %s", e)
 
             if voices_val is None:
-                vm = RE_VOICES_GENERIC.search(text)
-                if vm:
-                    try:
-                        voices_val = int(vm.group(1))
-                        logger.info(f"✅ Нашли голоса ({voices_val}) с RE_VOICES_GENERIC")
-                    except Exception as e:
-                        logger.error(f"❌ Ошибка парсинга голосов с RE_VOICES_GENERIC: {e}")
-
-            if voices_val is None:
-                vm = RE_VOICES_ANY.search(text)
-                if vm:
-                    try:
-                        voices_val = int(vm.group(1))
-                        logger.info(f"✅ Нашли голоса ({voices_val}) с RE_VOICES_ANY")
-                    except Exception as e:
-                        logger.error(f"❌ Ошибка парсинга голосов с RE_VOICES_ANY: {e}")
-
-            if voices_val is None:
-                vm = RE_VOICES_IN_PARENTHESES.search(text)
-                if vm:
-                    try:
-                        voices_val = int(vm.group(1))
-                        logger.info(f"✅ Нашли голоса ({voices_val}) в скобках")
-                    except Exception as e:
-                        logger.error(f"❌ Ошибка парсинга голосов в скобках: {e}")
-
-        # Выбираем лучший текст для анализа
-        result_candidates = []
-
-        for text in all_texts:
-            text_lower = text.lower()
-            if len(text) < 20 or "..." in text:
-                continue
-
-            if ("🌀" in text or "✨" in text or "☀" in text or
-                "на вас наложено" in text_lower or "на Вас наложено" in text or
-                "уменьшена на" in text_lower or "увеличена на" in text_lower or
-                "повышена на" in text_lower or "🍀" in text or
-                "воскресить" in text_lower or "воскрешение" in text_lower):
-                result_candidates.append(text)
-
-        if result_candidates:
-            full_response_text = max(result_candidates, key=len)
-            logger.debug(f"📋 Выбран текст результата ({len(full_response_text)} chars): {full_response_text[:200]}...")
-        elif all_texts:
-            full_response_text = all_texts[-1]
-            logger.debug(f"📋 Взяли последнее сообщение: {full_response_text[:200]}...")
-
-        # Проверка статуса (порядок ВАЖЕН!)
-        for m in msgs:
-            text = str(m.get("text", "")).strip()
-            logger.debug(f"🔍 Проверяем статус в сообщении: {text[:100]}...")
-
-            # 1. Самые специфичные ошибки
-            if RE_NOT_APOSTLE_OF_RACE.search(text):
-                matched = RE_NOT_APOSTLE_OF_RACE.search(text).group(0)
-                logger.info(f"🔍 Статус: NOT_APOSTLE_OF_RACE")
-                return "PASS_TO_NEXT_APOSTLE", remaining, voices_val, full_response_text
-
-            if RE_ALREADY_BUFF.search(text):
-                matched = RE_ALREADY_BUFF.search(text).group(0)
-                logger.info(f"🔍 Статус: ALREADY_BUFF")
-                return "ALREADY_BUFF", remaining, voices_val, full_response_text
-
-            if RE_OTHER_RACE.search(text):
-                matched = RE_OTHER_RACE.search(text).group(0)
-                logger.info(f"🔍 Статус: OTHER_RACE")
-                return "PASS_TO_NEXT_APOSTLE", remaining, voices_val, full_response_text
-
-            if RE_ALREADY_RACE.search(text):
-                matched = RE_ALREADY_RACE.search(text).group(0)
-                logger.info(f"🔍 Статус: ALREADY_BUFF")
-                return "ALREADY_BUFF", remaining, voices_val, full_response_text
-
-            # 2. Требуется Голос Древних
-            if RE_REQUIRES_ANCIENT_VOICE.search(text):
-                matched = RE_REQUIRES_ANCIENT_VOICE.search(text).group(0)
-                logger.info(f"🔍 Статус: NO_VOICES - требуется Голос Древних")
-                return "NO_VOICES", remaining, voices_val, full_response_text
-
-            # 3. Общие ошибки
-            if RE_NO_VOICES.search(text):
-                matched = RE_NO_VOICES.search(text).group(0)
-                logger.info(f"🔍 Статус: NO_VOICES")
-                return "NO_VOICES", remaining, voices_val, full_response_text
-
-            if RE_NOT_APOSTLE.search(text):
-                matched = RE_NOT_APOSTLE.search(text).group(0)
-                logger.info(f"🔍 Статус: NOT_APOSTLE")
-                return "NOT_APOSTLE", remaining, voices_val, full_response_text
-
-            # 4. Уже/КД
-            if RE_ALREADY.search(text):
-                matched = RE_ALREADY.search(text).group(0)
-                logger.info(f"🔍 Статус: ALREADY")
-                return "ALREADY", remaining, voices_val, full_response_text
-
-            if RE_COOLDOWN.search(text):
-                matched = RE_COOLDOWN.search(text).group(0)
-                if len(matched) > 50:
-                    matched = matched[:50] + "..."
-                logger.info(f"🔍 Статус: COOLDOWN")
-                return "COOLDOWN", remaining, voices_val, full_response_text
-
-            # ============= ВОСКРЕШЕНИЕ =============
-            if RE_RESURRECTION_SUCCESS.search(text) or RE_RESURRECTION.search(text):
-                logger.info(f"🔍 Статус: RESURRECTION_SUCCESS")
-                return "SUCCESS", remaining, voices_val, full_response_text
-            # =======================================
-
-            # ============= ОЧИЩЕНИЕ =============
-            if RE_CLEANSE.search(text):
-                logger.info(f"🔍 Статус: CLEANSE_SUCCESS")
-                return "SUCCESS", remaining, voices_val, full_response_text
-            # ====================================
-
-            # 5. УСПЕХ (в самом конце)
-            if RE_SUCCESS.search(text):
-                matched = RE_SUCCESS.search(text).group(0)
-                logger.info(f"🔍 Статус: SUCCESS")
-                return "SUCCESS", remaining, voices_val, full_response_text
+                voices_val = extract_voices(text)
+                if voices_val is not None:
+                    logger.info("✅ Нашли голоса (%s)", voices_val)
+
+            # Кандидат в текст результата — только если длиннее уже найденного
+            if (len(text) >= 20 and len(text) > len(best_text) and "..." not in text
+                    and _RE_RESULT_MARKER.search(text_l)):
+                best_text = text
+
+            # Статус — по первому сообщению, где он есть
+            # (порядок паттернов ВАЖЕН — задан в STATUS_PATTERN_ORDER)
+            if found is None:
+                found = classify_response(text)
+
+        if best_text:
+            full_response_text = best_text
+            logger.debug("📋 Выбран текст результата (%s chars): %.200s...", len(full_response_text), full_response_text)
+        elif last_text is not None:
+            full_response_text = last_text
+            logger.debug("📋 Взяли последнее сообщение: %.200s...", full_response_text)
+
+        if found is not None:
+            status, label = _STATUS_BY_PATTERN[found]
+            logger.info("🔍 Статус: %s", label)
+            return status, remaining, voices_val, full_response_text
 
         # Fallback
         if remaining is not None and cooldown_hint:
-            logger.info(f"🔍 Статус: COOLDOWN (fallback, remaining={remaining})")
+            logger.info("🔍 Статус: COOLDOWN (fallback, remaining=%s)", remaining)
             return "COOLDOWN", remaining, voices_val, full_response_text
 
         logger.info("🔍 Статус: UNKNOWN")
@@ -236,6 +189,11 @@ class AbilityExecutor:
         is_critical = False
         buff_value = 100
 
+        # Быстрый выход: обычный ответ без процентов и признаков крита
+        if not any(marker in text_lower for marker in _VALUE_MARKERS):
+            logger.debug("📊 Нет признаков крита/процента: 100 голосов")
+            return 100, False
+
         # ============= ВОСКРЕШЕНИЕ =============
         if "воскрешение" in text_lower or "воскресить" in text_lower:
             logger.info("♻ Воскрешение: 100 голосов")
@@ -266,34 +224,27 @@ class AbilityExecutor:
 
             # Пробуем найти процент для проклятий
             if "уменьшена на" in text_lower or "увеличена на" in text_lower:
-                percent_patterns = [
-                    r"уменьшена на\s+(\d{1,3})\s*%",
-                    r"увеличена на\s+(\d{1,3})\s*%",
-                    r"на\s+(\d{1,3})\s*%",
-                    r"(\+?\d{1,3})\s*%"
-                ]
-
-                for pattern in percent_patterns:
-                    match = re.search(pattern, text_lower)
+                for rx in _CURSE_PERCENT_RES:
+                    match = rx.search(text_lower)
                     if match:
                         try:
                             percent = int(match.group(1))
                             if percent == 30:
                                 is_critical = True
                                 buff_value = 150
-                                logger.info(f"👿 Критическое проклятие {percent}%: 150 голосов")
+                                logger.info("👿 Критическое проклятие %s%%: 150 голосов", percent)
                             elif percent == 20:
                                 is_critical = False
                                 buff_value = 100
-                                logger.info(f"👿 Обычное проклятие {percent}%: 100 голосов")
+                                logger.info("👿 Обычное проклятие %s%%: 100 голосов", percent)
                             break
                         except Exception as e:
-                            logger.debug(f"❌ Ошибка парсинга процента проклятия: {e}")
+                            logger.debug("❌ Ошибка парсинга процента проклятия: %s", e)
 
             return buff_value, is_critical
 
         # 1. Удача в единицах — приоритет
-        luck_match = re.search(r"удача\s+повышена\s+на\s+(\d{1,3})", text_lower)
+        luck_match = _RE_LUCK.search(text_lower)
         if luck_match:
             try:
                 luck_val = int(luck_match.group(1))
@@ -303,71 +254,50 @@ class AbilityExecutor:
                 if luck_val == 6:
                     logger.info("🍀 Баф удачи: 6 единиц = 100 голосов (обычный)")
                     return 100, False
-                logger.info(f"🍀 Баф удачи: {luck_val} единиц → по умолчанию 100 голосов")
+                logger.info("🍀 Баф удачи: %s единиц → по умолчанию 100 голосов", luck_val)
                 return 100, False
             except Exception as e:
-                logger.debug(f"❌ Ошибка парсинга удачи: {e}")
+                logger.debug("❌ Ошибка парсинга удачи: %s", e)
 
         # 2. Расовые бафы — фиксированная стоимость
-        race_keywords = [
-            "человек", "гоблин", "нежить", "эльф", "гном", "демон", "орк",
-            "людей", "гоблинов", "нежити", "эльфов", "гномов", "демонов", "орков",
-        ]
-        if any(race in text_lower for race in race_keywords):
-            logger.debug(f"📊 Расовый баф: {text[:50]}...")
+        if _RE_RACE_KEYWORD.search(text_lower):
+            logger.debug("📊 Расовый баф: %.50s...", text)
             return 100, False
 
         # 3. Общие проценты (атака/защита/прочее)
-        percent_patterns = [
-            r"(\+?\d{1,3})\s*%",
-            r"на\s+(\d{1,3})\s*%",
-            r"повышена\s+на\s+(\d{1,3})\s*%",
-            r"увеличена\s+на\s+(\d{1,3})\s*%",
-            r"повышена\s+(\d{1,3})\s*%",
-            r"увеличена\s+(\d{1,3})\s*%",
-            r"броня повышена на (\d{1,3})%",
-            r"атака повышена на (\d{1,3})%",
-        ]
-
         found_percent = None
 
-        for pattern in percent_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    found_percent = int(match.group(1))
-                    logger.info(f"🔍 Найден процент: {found_percent}%")
-                    break
-                except Exception as e:
-                    logger.debug(f"❌ Ошибка парсинга процента: {e}")
-                    continue
+        match = _RE_BUFF_PERCENT.search(text)
+        if match:
+            found_percent = int(match.group(1))
+            logger.info("🔍 Найден процент: %s%%", found_percent)
 
         if found_percent is not None:
             if found_percent == 30:
                 is_critical = True
                 buff_value = 150
-                logger.info(f"🎯 Крит баф: {found_percent}% = {buff_value} голосов")
+                logger.info("🎯 Крит баф: %s%% = %s голосов", found_percent, buff_value)
             elif found_percent == 20:
                 is_critical = False
                 buff_value = 100
-                logger.info(f"📊 Обычный баф: {found_percent}% = {buff_value} голосов")
+                logger.info("📊 Обычный баф: %s%% = %s голосов", found_percent, buff_value)
             else:
                 buff_value = 100
                 is_critical = "критический" in text_lower or "🍀" in text_lower
-                logger.info(f"📈 Баф {found_percent}%: значение={buff_value}, крит={is_critical}")
+                logger.info("📈 Баф %s%%: значение=%s, крит=%s", found_percent, buff_value, is_critical)
         else:
-            logger.debug(f"📝 Процент не найден в тексте: {text[:100]}...")
+            logger.debug("📝 Процент не найден в тексте: %.100s...", text)
 
         if not is_critical and ("критический баф" in text_lower or "🍀" in text_lower):
             is_critical = True
             buff_value = 150
             logger.info("🍀 Определен крит баф по тексту")
 
-        if any(x in text_lower for x in ["атаки", "защиты"]):
+        if "атаки" in text_lower or "защиты" in text_lower:
             buff_value = 150 if is_critical else 100
-            logger.debug(f"⚔️ Баф атаки/защиты: значение={buff_value}, крит={is_critical}")
+            logger.debug("⚔️ Баф атаки/защиты: значение=%s, крит=%s", buff_value, is_critical)
 
-        logger.info(f"📊 Итог парсинга: значение={buff_value}, крит={is_critical}")
+        logger.info("📊 Итог парсинга: значение=%s, крит=%s", buff_value, is_critical)
         return buff_value, is_critical
 
     def execute_one(
@@ -381,7 +311,7 @@ class AbilityExecutor:
             if observer_token and (
                 token.id == observer_token.id or token.name == "Observer"
             ):
-                logger.warning(f"⛔ {token.name} является Observer и не должен участвовать в бафах")
+                logger.warning("⛔ %s является Observer и не должен участвовать в бафах", token.name)
                 token.increment_buff_stats(False)
                 return False, "OBSERVER_CANNOT_BUFF", None
 
@@ -399,9 +329,9 @@ class AbilityExecutor:
 
             # Автообновление профиля, если способность тратит голоса и локально 0
             if ability.uses_voices and token.voices <= 0:
-                logger.info(f"🔄 {token.name}: voices=0, пробуем refresh_profile перед бафом")
+                logger.info("🔄 %s: voices=0, пробуем refresh_profile перед бафом", token.name)
                 if self.refresh_profile(token) and token.voices > 0:
-                    logger.info(f"✅ {token.name}: после refresh_profile голосов стало {token.voices}")
+                    logger.info("✅ %s: после refresh_profile голосов стало %s", token.name, token.voices)
                 else:
                     token.increment_buff_stats(False)
                     return False, "NO_VOICES_LOCAL", None
@@ -442,14 +372,25 @@ class AbilityExecutor:
                 poll_count = int(self.tm.settings.get("poll_count", 20))
 
                 buff_response_text = ""
+                # RACE_NAMES — dict, проверка O(1); считаем её один раз на баф
+                is_race = ability.key in RACE_NAMES
 
                 for i in range(poll_count):
-                    time.sleep(poll_interval * (1 + i * 0.2))
+                    # Первый опрос — после короткой паузы (игра обычно отвечает
+                    # за секунду), дальше прежние растущие паузы
+                    if i == 0:
+                        time.sleep(min(_FIRST_POLL_DELAY, poll_interval))
+                    else:
+                        time.sleep(poll_interval * (1 + i * 0.2))
+
+                    # Кэш истории живёт дольше первой паузы — без сброса
+                    # повторный опрос вернул бы ту же закэшированную историю
+                    token.invalidate_cache(token.target_peer_id)
                     history = token.get_history_cached(token.target_peer_id, count=25)
                     new_msgs = [
                         m
                         for m in history
-                        if int(m.get("id", 0)) > last_id_before
+                        if m.get("id", 0) > last_id_before
                     ]
                     if not new_msgs:
                         continue
@@ -458,12 +399,14 @@ class AbilityExecutor:
                         self._parse_new_messages(list(reversed(new_msgs)))
                     )
 
-                    if full_response_text and not buff_response_text:
+                    # Каждый опрос разбирает все новые сообщения с начала, поэтому
+                    # последний текст полнее: ранний опрос мог застать ответ частично
+                    if full_response_text:
                         buff_response_text = full_response_text
-                        logger.debug(f"📋 Получен полный текст ответа: {buff_response_text[:200]}...")
+                        logger.debug("📋 Получен полный текст ответа: %.200s...", buff_response_text)
 
                     if voices_val is not None:
-                        logger.info(f"🗣️ {token.name}: обновление голосов {token.voices} → {voices_val}")
+                        logger.info("🗣️ %s: обновление голосов %s → %s", token.name, token.voices, voices_val)
                         token.update_voices_from_system(voices_val)
                         token.mark_for_save()
 
@@ -472,7 +415,7 @@ class AbilityExecutor:
                         return False, "PASS_TO_NEXT_APOSTLE", None
 
                     if status == "NOT_APOSTLE_OF_RACE":
-                        if ability.key in RACE_NAMES:
+                        if is_race:
                             before_cnt = len(token.temp_races)
                             token.temp_races = [
                                 tr for tr in token.temp_races if tr["race"] != ability.key
@@ -480,7 +423,7 @@ class AbilityExecutor:
                             if len(token.temp_races) != before_cnt:
                                 self.tm.mark_for_save()
                                 self.tm.update_race_index(token)
-                            logger.warning(f"🗑️ {token.name}: удалена временная раса '{ability.key}'")
+                            logger.warning("🗑️ %s: удалена временная раса '%s'", token.name, ability.key)
 
                         token.set_ability_cooldown(ability.key, 300)
                         token.set_social_cooldown(300)
@@ -495,7 +438,7 @@ class AbilityExecutor:
                         return False, "PASS_TO_NEXT_APOSTLE", None
 
                     if status == "NOT_APOSTLE":
-                        if ability.key in RACE_NAMES:
+                        if is_race:
                             before_cnt = len(token.temp_races)
                             token.temp_races = [
                                 tr for tr in token.temp_races if tr["race"] != ability.key
@@ -503,7 +446,7 @@ class AbilityExecutor:
                             if len(token.temp_races) != before_cnt:
                                 self.tm.mark_for_save()
                                 self.tm.update_race_index(token)
-                            logger.warning(f"🗑️ {token.name}: удалена временная раса '{ability.key}'")
+                            logger.warning("🗑️ %s: удалена временная раса '%s'", token.name, ability.key)
 
                         token.set_ability_cooldown(ability.key, 300)
                         token.set_social_cooldown(300)
@@ -515,11 +458,11 @@ class AbilityExecutor:
                         token.set_ability_cooldown(ability.key, ability.cooldown)
                         token.set_social_cooldown(62)
 
-                        if ability.key in RACE_NAMES:
+                        if is_race:
                             owner = self.tm.get_token_by_sender_id(job.sender_id)
                             if owner and owner.class_type == "apostle":
                                 if observer_token and owner.id == observer_token.id:
-                                    logger.debug(f"ℹ️ Observer получил баф {ability.key}")
+                                    logger.debug("ℹ️ Observer получил баф %s", ability.key)
                                 else:
                                     now_ts = time.time()
                                     expires_at = round(now_ts + 2 * 60 * 60)
@@ -533,29 +476,29 @@ class AbilityExecutor:
                                             expires_at=expires_at,
                                         )
                                         if added:
-                                            logger.info(f"🎯 {owner.name}: добавлена временная раса '{ability.key}'")
+                                            logger.info("🎯 %s: добавлена временная раса '%s'", owner.name, ability.key)
                                         else:
-                                            logger.warning(f"⚠️ {owner.name}: не удалось добавить временную расу '{ability.key}'")
+                                            logger.warning("⚠️ %s: не удалось добавить временную расу '%s'", owner.name, ability.key)
                                     self.tm.update_race_index(owner)
 
                         # ============= СПИСАНИЕ ГОЛОСА =============
                         if ability.uses_voices:
                             if token.spend_voice():
-                                logger.info(f"🗣️ {token.name}: списан голос (осталось {token.voices})")
+                                logger.info("🗣️ %s: списан голос (осталось %s)", token.name, token.voices)
                             else:
-                                logger.error(f"❌ {token.name}: НЕ УДАЛОСЬ списать голос! voices={token.voices}")
+                                logger.error("❌ %s: НЕ УДАЛОСЬ списать голос! voices=%s", token.name, token.voices)
                                 if token.voice_prophet:
                                     token.voice_prophet.record_check(token.voices, None)
                         # =========================================
 
-                        logger.debug(f"🔍 Анализ крита для бафа '{ability.text}':")
-                        logger.debug(f"📋 Текст ответа: {buff_response_text[:200]}...")
+                        logger.debug("🔍 Анализ крита для бафа '%s':", ability.text)
+                        logger.debug("📋 Текст ответа: %.200s...", buff_response_text)
 
                         buff_value, is_critical = self._parse_buff_value(
                             buff_response_text
                         )
 
-                        logger.info(f"📊 {token.name}: {ability.text} (значение: {buff_value}, крит: {is_critical})")
+                        logger.info("📊 %s: %s (значение: %s, крит: %s)", token.name, ability.text, buff_value, is_critical)
 
                         token.successful_buffs += 1
                         token.total_attempts += 1
@@ -578,7 +521,7 @@ class AbilityExecutor:
                         token.successful_buffs += 1
                         token.total_attempts += 1
                         token.mark_for_save()
-                        logger.info(f"ℹ️ {token.name}: {ability.text} ALREADY")
+                        logger.info("ℹ️ %s: %s ALREADY", token.name, ability.text)
                         return True, "ALREADY", None
 
                     if status == "NO_VOICES":
@@ -593,7 +536,7 @@ class AbilityExecutor:
                             token.set_ability_cooldown(ability.key, rem_safe)
                             token.set_social_cooldown(rem_safe)
                             token.increment_buff_stats(False)
-                            logger.warning(f"⚠️ {token.name}: COOLDOWN => {rem_safe}s")
+                            logger.warning("⚠️ %s: COOLDOWN => %ss", token.name, rem_safe)
                             return False, f"COOLDOWN({rem_safe}s)", None
 
                         token.set_ability_cooldown(ability.key, 62)
@@ -615,10 +558,24 @@ class AbilityExecutor:
         if not ok:
             return False
 
-        time.sleep(3.0)
+        # Профиль обычно приходит быстрее секунды: опрашиваем с растущей
+        # паузой до появления голосов, но не дольше прежних 3 секунд
+        deadline = time.monotonic() + _PROFILE_WAIT
+        delay = _FIRST_POLL_DELAY
+        new_msgs = []
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            time.sleep(min(delay, left))
+            delay *= _POLL_BACKOFF
+
+            token.invalidate_cache(token.target_peer_id)
+            history = token.get_history_cached(token.target_peer_id, count=25)
+            new_msgs = [m for m in history if m.get("id", 0) > last_id_before]
+            if any(extract_voices(str(m.get("text", ""))) is not None for m in new_msgs):
+                break
 
-        history = token.get_history_cached(token.target_peer_id, count=25)
-        new_msgs = [m for m in history if int(m.get("id", 0)) > last_id_before]
         if not new_msgs:
             return False
 
@@ -626,37 +583,14 @@ class AbilityExecutor:
 
         for m in reversed(new_msgs):
             text = str(m.get("text", "")).strip()
-            logger.debug(f"📊 Парсим профиль: {text[:200]}")
-
-            found_voices = None
-            vm = RE_VOICES_GENERIC.search(text)
-            if vm:
-                try:
-                    found_voices = int(vm.group(1))
-                except Exception as e:
-                    logger.error(f"❌ {token.name}: ошибка парсинга голосов: {e}")
-
-            if found_voices is None:
-                vm = RE_VOICES_ANY.search(text)
-                if vm:
-                    try:
-                        found_voices = int(vm.group(1))
-                    except Exception as e:
-                        logger.error(f"❌ {token.name}: ошибка парсинга голосов: {e}")
-
-            if found_voices is None:
-                vm = RE_VOICES_IN_PARENTHESES.search(text)
-                if vm:
-                    try:
-                        found_voices = int(vm.group(1))
-                    except Exception as e:
-                        logger.error(f"❌ {token.name}: ошибка парсинга голосов в скобках: {e}")
+            logger.debug("📊 Парсим профиль: %.200s", text)
 
+            found_voices = extract_voices(text)
             if found_voices is not None:
                 token.update_voices_from_system(found_voices)
                 token.mark_for_save()
                 got_voices = True
-                logger.info(f"📊 {token.name}: обновлены голоса: {found_voices}")
+                logger.info("📊 %s: обновлены голоса: %s", token.name, found_voices)
 
             level_match = RE_PROFILE_LEVEL.search(text)
             if level_match:
@@ -664,8 +598,8 @@ class AbilityExecutor:
                     level = int(level_match.group(1))
                     token.update_level(level)
                     token.mark_for_save()
-                    logger.info(f"📊 {token.name}: обновлен уровень: {level}")
+                    logger.info("📊 %s: обновлен уровень: %s", token.name, level)
                 except Exception as e:
-                    logger.error(f"❌ {token.name}: ошибка парсинга уровня: {e}")
+                    logger.error("❌ %s: ошибка парсинга уровня: %s", token.name, e)
 
         return got_voices
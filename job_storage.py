@@ -6,25 +6,132 @@ import threading
 import time
 from typing import Dict, Tuple, Any, Optional
 
+try:
+    import orjson
+except ImportError:  # orjson — необязательная зависимость, fallback на stdlib json
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Any:
+    # orjson.JSONDecodeError наследуется от json.JSONDecodeError
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 class JobStorage:
     """
     Простое файловое хранилище активных бафов по user_id.
     Хранит чистые dict-и, без импортов из observer.py, чтобы избежать циклов.
+
+    Формат на диске:
+        <path>        — снимок { "user_id": {"job": ..., "buff": ...} }
+        <base>.log    — журнал изменений (NDJSON) поверх снимка
+
+    Изменения дописываются в журнал одной строкой; снимок перезаписывается
+    целиком только при компактизации (по размеру журнала и через compact()).
     """
 
+    # Сколько записей журнала копим до компактизации в снимок
+    COMPACT_EVERY = 200
+
     def __init__(self, path: str):
         self.path = path
+        self.log_path = os.path.splitext(path)[0] + ".log"
         self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._log_records = 0
 
     def _atomic_write(self, data: Dict[str, Any]) -> None:
         tmp = self.path + ".tmp"
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open(tmp, "wb") as f:
+            f.write(_dumps(data, indent=True))
         os.replace(tmp, self.path)
 
+    def _load_locked(self) -> Dict[str, Any]:
+        """Снимок + журнал → текущее состояние (читается с диска один раз)."""
+        if self._data is not None:
+            return self._data
+
+        data: Dict[str, Any] = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "rb") as f:
+                    data = _loads(f.read())
+            except (OSError, ValueError) as e:
+                logger.error(f"❌ JobStorage: ошибка чтения {self.path}: {e}")
+                data = {}
+
+        records = 0
+        broken = False
+        if os.path.exists(self.log_path):
+            try:
+                with open(self.log_path, "rb") as f:
+                    lines = f.read().splitlines()
+            except OSError as e:
+                logger.error(f"❌ JobStorage: ошибка чтения {self.log_path}: {e}")
+                lines = []
+
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    rec = _loads(line)
+                    key = str(rec["user_id"])
+                    if rec.get("op") == "delete":
+                        data.pop(key, None)
+                    else:
+                        data[key] = {"job": rec.get("job"), "buff": rec.get("buff")}
+                    records += 1
+                except (ValueError, KeyError, TypeError) as e:
+                    # Оборванная последняя строка после аварийного завершения
+                    logger.warning(f"⚠️ JobStorage: пропущена запись журнала: {e}")
+                    broken = True
+
+        self._data = data
+        self._log_records = records
+        if broken:
+            # Не дописываем новые записи после оборванной строки
+            self._compact_locked()
+        return data
+
+    def _append_locked(self, line: bytes) -> None:
+        with open(self.log_path, "ab") as f:
+            f.write(line + b"\n")
+        self._log_records += 1
+        if self._log_records >= self.COMPACT_EVERY:
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        data = self._load_locked()
+        if data:
+            self._atomic_write(data)
+        else:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+        try:
+            os.remove(self.log_path)
+        except OSError:
+            pass
+        self._log_records = 0
+
+    def compact(self) -> None:
+        """Свернуть журнал в снимок (вызывается при штатной остановке)."""
+        with self._lock:
+            if self._data is None and not os.path.exists(self.log_path):
+                return
+            self._compact_locked()
+
     def load_all(self) -> Dict[int, Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
         """
         Возвращает:
@@ -45,15 +152,8 @@ class JobStorage:
                 "completed_count": int,
             }
         """
-        if not os.path.exists(self.path):
-            return {}
-
-        try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                raw = json.load(f)
-        except (OSError, json.JSONDecodeError) as e:
-            logger.error(f"❌ JobStorage: ошибка чтения {self.path}: {e}")
-            return {}
+        with self._lock:
+            raw = dict(self._load_locked())
 
         result: Dict[int, Tuple[Dict[str, Any], Optional[Dict[str, Any]]]] = {}
         now = time.time()
@@ -88,41 +188,26 @@ class JobStorage:
     ) -> None:
         """Сохранить/обновить активный баф для пользователя (в виде dict-ов)."""
         with self._lock:
-            data: Dict[str, Any] = {}
-            if os.path.exists(self.path):
-                try:
-                    with open(self.path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                except (OSError, json.JSONDecodeError):
-                    data = {}
-
-            data[str(user_id)] = {
+            data = self._load_locked()
+            line = _dumps({
+                "op": "save",
+                "user_id": user_id,
                 "job": job_info,
                 "buff": buff_info,
-            }
-            self._atomic_write(data)
+            })
+            # В памяти — копия из той же строки журнала, а не живые dict-и
+            # вызывающего: их изменения (например, tokens_info) без новой
+            # записи в журнал не должны попадать в состояние
+            rec = _loads(line)
+            data[str(user_id)] = {"job": rec["job"], "buff": rec["buff"]}
+            self._append_locked(line)
 
     def delete_for_user(self, user_id: int) -> None:
         """Удалить активный баф пользователя из хранилища."""
         with self._lock:
-            if not os.path.exists(self.path):
-                return
-            try:
-                with open(self.path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except (OSError, json.JSONDecodeError):
+            data = self._load_locked()
+            if str(user_id) not in data:
                 return
 
-            changed = False
-            if str(user_id) in data:
-                del data[str(user_id)]
-                changed = True
-
-            if changed:
-                if data:
-                    self._atomic_write(data)
-                else:
-                    try:
-                        os.remove(self.path)
-                    except OSError:
-                        pass
+            del data[str(user_id)]
+            self._append_locked(_dumps({"op": "delete", "user_id": user_id}))
@@ -156,6 +156,7 @@ def main() -> None:
         
         logging.info("💾 Сохраняю финальную конфигурацию...")
         tm.save(force=True)
+        observer_bot.state.compact()
         
         logging.info("👋 Система остановлена")
         
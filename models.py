@@ -2,11 +2,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+import sys
 import time
 
+from .utils import normalize_text
 
-@dataclass
+# __slots__ для dataclass-ов (dataclass(slots=True) доступен с Python 3.10).
+# frozen не используем: Job/ParsedAbility меняются по ходу выполнения бафа.
+DATACLASS_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**DATACLASS_SLOTS)
 class ParsedAbility:
     key: str
     text: str
@@ -16,7 +23,25 @@ class ParsedAbility:
     token_name: Optional[str] = None
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
+class CustomBuff:
+    """Баф Ара/Кир, пришедший в ответе игры"""
+    buff_key: str
+    is_critical: bool = False
+    buff_value: int = 100
+
+
+@dataclass(**DATACLASS_SLOTS)
+class TriggerState:
+    """Ожидающий триггер Ара/Кир: заказанные бафы и полученные ответы"""
+    buff_keys: Tuple[str, ...]
+    executor_id: int
+    created_at: float
+    responses: Dict[str, CustomBuff] = field(default_factory=dict)  # в порядке получения
+    completed: bool = False
+
+
+@dataclass(**DATACLASS_SLOTS)
 class Job:
     sender_id: int
     trigger_text: str
@@ -27,6 +52,11 @@ class Job:
     cancelled: bool = False
     extra: Dict[str, Any] = field(default_factory=dict)
     registration_msg_id: Optional[int] = None  # ← ДОБАВЛЯЕМ ЭТО ПОЛЕ
+    # normalize_text(trigger_text) — считается один раз при создании задания
+    trigger_norm: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.trigger_norm = normalize_text(self.trigger_text)
 
     def is_cancelled(self) -> bool:
         return bool(self.cancelled)
@@ -3,16 +3,15 @@ import logging
 import time
 import re
 import threading  # <-- ИМПОРТ ПЕРЕМЕЩЁН СЮДА
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
-from .utils import normalize_text
 from .commands import (
-    parse_baf_letters, parse_golosa_cmd, parse_doprasa_cmd,
-    is_apo_cmd, is_baf_cancel_cmd, is_prof_cmd
+    classify, parse_baf_letters, parse_golosa_cmd, parse_doprasa_cmd,
+    is_baf_cancel_cmd
 )
 from .notifications import build_registration_text
 from .models import Job
-from .constants import RACE_NAMES
+from .constants import RACE_NAMES, RACE_TEXT_TO_KEY
 from .regexes import RE_PROFILE_LEVEL, RE_VOICES_GENERIC, RE_VOICES_ANY
 
 logger = logging.getLogger(__name__)
@@ -28,56 +27,70 @@ class CommandHandler:
         # ID Observer-а
         self.OBSERVER_ID = 92900278
 
-    def handle(self, text: str, from_id: int, msg: dict) -> bool:
-        norm = normalize_text(text)
-        logger.debug(f"handle: norm='{norm}', from_id={from_id}, original='{text}'")
-
-        # Отмена бафов
-        if is_baf_cancel_cmd(norm):
-            logger.info("Обнаружена команда отмены бафов")
-            return self._cancel(from_id)
+    def handle(
+        self,
+        text: str,
+        from_id: int,
+        msg: dict,
+        classified: Optional[Tuple[str, str]] = None,
+    ) -> bool:
+        kind, norm = classified if classified is not None else classify(text)
+        logger.debug(f"handle: kind='{kind}', norm='{norm}', from_id={from_id}, original='{text}'")
+
+        if not kind:
+            return False
+
+        if kind == "baf":
+            # Отмена бафов
+            if is_baf_cancel_cmd(norm):
+                logger.info("Обнаружена команда отмены бафов")
+                return self._cancel(from_id)
+
+            letters = parse_baf_letters(norm)
+            if letters:
+                self._baf(
+                    letters, from_id, text,
+                    msg.get("conversation_message_id"),
+                    msg.get("id")
+                )
+                return True
+            return False
 
         # Команда /проф для проверки профиля
-        if is_prof_cmd(norm):
+        if kind == "prof":
             logger.info(f"✅ Обнаружена команда /проф: '{text}'")
             return self._profile_check(text, from_id)
 
-        if norm in ["/здоровье", "/health", "/статус"]:
-            self._health(from_id)
-            return True
+        if kind == "health":
+            if norm in ["/здоровье", "/health", "/статус"]:
+                self._health(from_id)
+                return True
+            return False
 
-        if norm.startswith("/диагностика"):
+        if kind == "diag":
             self._diag(text, from_id)
             return True
 
-        if norm.startswith("/апо "):
-            self._apo_toggle(text, from_id)
+        if kind == "apo":
+            if norm.startswith("/апо "):
+                self._apo_toggle(text, from_id)
+            else:
+                self._apo_status(from_id)
             return True
 
-        if norm.startswith("/сменарасы"):
+        if kind == "change_races":
             self._change_races(text, from_id)
             return True
 
-        pg = parse_golosa_cmd(text)
-        if pg:
-            self._voices(from_id, pg[1])
-            return True
-
-        if norm.startswith("/допраса"):
-            self._doprasa(text, from_id, msg)
-            return True
-
-        if is_apo_cmd(norm):
-            self._apo_status(from_id)
-            return True
+        if kind == "golosa":
+            pg = parse_golosa_cmd(norm)
+            if pg:
+                self._voices(from_id, pg[1])
+                return True
+            return False
 
-        letters = parse_baf_letters(text)
-        if letters:
-            self._baf(
-                letters, from_id, text,
-                msg.get("conversation_message_id"),
-                msg.get("id")
-            )
+        if kind == "doprasa":
+            self._doprasa(text, from_id, msg, norm)
             return True
 
         return False
@@ -368,15 +381,8 @@ class CommandHandler:
 
         # Расы
         text_lower = text.lower()
-        race_mapping = {
-            "человек": "ч", "гоблин": "г", "нежить": "н",
-            "эльф": "э", "гном": "м", "демон": "д", "орк": "о",
-            "людей": "ч", "гоблинов": "г", "нежити": "н",
-            "эльфов": "э", "гномов": "м", "демонов": "д", "орков": "о",
-        }
-
         races = []
-        for race_name, race_key in race_mapping.items():
+        for race_name, race_key in RACE_TEXT_TO_KEY.items():
             if race_name in text_lower:
                 races.append(race_key)
 
@@ -555,13 +561,13 @@ class CommandHandler:
             f"✅ {token.name}: голоса = {voices}"
         )
 
-    def _doprasa(self, text: str, from_id: int, msg: dict):
+    def _doprasa(self, text: str, from_id: int, msg: dict, norm: str):
         from .commands import parse_doprasa_cmd
         from .utils import (
             timestamp_to_moscow, now_moscow, format_moscow_time
         )
 
-        parsed = parse_doprasa_cmd(text, msg)
+        parsed = parse_doprasa_cmd(text, msg, norm)
         if not parsed:
             self.bot.send_to_peer(
                 self.bot.source_peer_id,
@@ -43,7 +43,14 @@ class ObserverBot:
         )
 
         self.state = JobStateStore(storage_path="jobs.json")
-        self.state.restore_and_enqueue(self.scheduler)
+        # Восстановление jobs.json в фоне, чтобы не задерживать старт на дисковом I/O
+        self._restore_thread = threading.Thread(
+            target=self.state.restore_and_enqueue,
+            args=(self.scheduler,),
+            name="JobRestore",
+            daemon=True,
+        )
+        self._restore_thread.start()
 
         # Очереди для сообщений
         self.user_message_queue = queue.Queue()
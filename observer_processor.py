@@ -4,10 +4,11 @@ import threading
 import queue
 import time
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from .regexes import RE_PROFILE_LEVEL, RE_VOICES_GENERIC, RE_VOICES_ANY
-from .constants import RACE_NAMES
+from .constants import RACE_NAMES, RACE_TEXT_TO_KEY
+from .commands import classify
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,9 @@ class MessageProcessor:
         self.GROUP_CHAT_ID = 2000000007  # Чат 7 для команд группы
         self.GAME_CHAT_ID = -183040898   # Чат игры для ответов на /баф
 
+        # Сколько сообщений забираем из очереди за один проход
+        self.BATCH_SIZE = 32
+
         # Регулярка для голосов в скобках у класса (как в ProfileManager)
         self.RE_VOICES_FROM_CLASS_PARENS = re.compile(
             r"👤\s*Класс:\s*[^\(\n]*\((\d+)\)", re.IGNORECASE
@@ -42,19 +46,43 @@ class MessageProcessor:
     def stop(self):
         self._running = False
 
+    def _drain(self, q: queue.Queue) -> List[Tuple[str, dict]]:
+        """Ждёт первое сообщение и добирает то, что уже лежит в очереди."""
+        batch = [q.get(timeout=1)]
+        while len(batch) < self.BATCH_SIZE:
+            try:
+                batch.append(q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
     def _worker(self):
+        if self.queue_type == 'user':
+            process = self._process_user_message
+        else:
+            process = self._process_group_message
+
+        if self.queue_type == 'user':
+            # Команды — только после восстановления jobs.json: иначе /баф,
+            # пришедший во время восстановления, завёл бы второй баф
+            # (сообщения тем временем копятся в очереди LongPoll)
+            self.bot.state.wait_restored()
+
         while self._running:
             try:
                 if self.queue_type == 'user':
-                    msg_type, msg = self.bot.user_message_queue.get(timeout=1)
-                    self._process_user_message(msg_type, msg)
+                    batch = self._drain(self.bot.user_message_queue)
                 else:
-                    msg_type, msg = self.bot.group_message_queue.get(timeout=1)
-                    self._process_group_message(msg_type, msg)
+                    batch = [self.bot.group_message_queue.get(timeout=1)]
             except queue.Empty:
                 continue
-            except Exception as e:
-                logger.error(f"❌ Ошибка в processor ({self.queue_type}): {e}", exc_info=True)
+
+            # Ошибка в одном сообщении не теряет остальные сообщения пачки
+            for msg_type, msg in batch:
+                try:
+                    process(msg_type, msg)
+                except Exception as e:
+                    logger.error(f"❌ Ошибка в processor ({self.queue_type}): {e}", exc_info=True)
 
     def _process_user_message(self, msg_type: str, msg: dict):
         """Обработка сообщений из очереди пользовательского токена"""
@@ -126,9 +154,13 @@ class MessageProcessor:
         """
         logger.info(f"👤 Команда от пользователя {from_id} в чате 120: {text[:50]}...")
 
+        # Классифицируем только сообщения чата команд: ответы игры и чужие
+        # чаты отсеиваются раньше и результат им не нужен
+        classified = classify(text)
+
         # Команда воскрешения
-        if text.startswith("/воскрешение"):
-            self.bot.res_handler.handle(text, from_id)
+        if classified[0] == "res":
+            self.bot.res_handler.handle(text, from_id, classified[1])
             return
 
         # Кастомные триггеры (Ара/Кир)
@@ -136,7 +168,7 @@ class MessageProcessor:
             return
 
         # Остальные команды (/баф, /диагностика, /апо и т.п.)
-        self.bot.cmd_handler.handle(text, from_id, msg)
+        self.bot.cmd_handler.handle(text, from_id, msg, classified)
 
     def _parse_profile_response(self, text: str) -> Dict[str, Any]:
         """
@@ -185,15 +217,8 @@ class MessageProcessor:
 
         # 3) Расы
         text_lower = text.lower()
-        race_mapping = {
-            "человек": "ч", "гоблин": "г", "нежить": "н",
-            "эльф": "э", "гном": "м", "демон": "д", "орк": "о",
-            "людей": "ч", "гоблинов": "г", "нежити": "н",
-            "эльфов": "э", "гномов": "м", "демонов": "д", "орков": "о",
-        }
-
         races = []
-        for race_name, race_key in race_mapping.items():
+        for race_name, race_key in RACE_TEXT_TO_KEY.items():
             if race_name in text_lower:
                 races.append(race_key)
 
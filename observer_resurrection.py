@@ -7,12 +7,11 @@ from typing import Tuple, Optional  # ← ДОБАВЛЯЕМ НЕДОСТАЮЩ
 
 from .constants import RESURRECTION_CONFIG
 from .commands import parse_resurrection_cmd
+from .utils import normalize_text
 from .regexes import (
     RE_RESURRECTION_SUCCESS, 
     RE_RESURRECTION,
-    RE_VOICES_GENERIC, 
-    RE_VOICES_ANY, 
-    RE_VOICES_IN_PARENTHESES
+    extract_voices,
 )
 
 logger = logging.getLogger(__name__)
@@ -27,7 +26,7 @@ class ResurrectionHandler:
         Находит оригинальное сообщение пользователя в истории source_peer_id токена.
         Точно как в executor.py для /баф.
         """
-        want_text = (trigger_text or "").strip().lower()
+        want_text = normalize_text(trigger_text)
         if not want_text:
             return None, None
 
@@ -37,7 +36,7 @@ class ResurrectionHandler:
             msg_from_id = int(m.get("from_id", 0))
             if msg_from_id != from_id:
                 continue
-            txt = (m.get("text", "") or "").strip().lower()
+            txt = normalize_text(m.get("text", ""))
             if txt == want_text:
                 mid = int(m.get("id", 0))
                 cmid = m.get("conversation_message_id")
@@ -52,10 +51,10 @@ class ResurrectionHandler:
         logger.debug(f"⚠️ Сообщение '{want_text}' не найдено в history токена {token.name}")
         return None, None
 
-    def handle(self, text: str, from_id: int):
-        """Обработка команды /воскрешение"""
+    def handle(self, text: str, from_id: int, norm: str):
+        """Обработка команды /воскрешение (norm — текст после classify)"""
         # Парсим уровень цели
-        lvl = parse_resurrection_cmd(text)
+        lvl = parse_resurrection_cmd(norm)
         if not lvl:
             self.bot.send_to_peer(
                 self.bot.source_peer_id, 
@@ -180,31 +179,9 @@ class ResurrectionHandler:
                 
                 # Парсим голоса
                 if voices_val is None:
-                    vm = RE_VOICES_GENERIC.search(msg_text)
-                    if vm:
-                        try:
-                            voices_val = int(vm.group(1))
-                            logger.info(f"🗣️ Найдены голоса: {voices_val}")
-                        except:
-                            pass
-                
-                if voices_val is None:
-                    vm = RE_VOICES_ANY.search(msg_text)
-                    if vm:
-                        try:
-                            voices_val = int(vm.group(1))
-                            logger.info(f"🗣️ Найдены голоса: {voices_val}")
-                        except:
-                            pass
-                
-                if voices_val is None:
-                    vm = RE_VOICES_IN_PARENTHESES.search(msg_text)
-                    if vm:
-                        try:
-                            voices_val = int(vm.group(1))
-                            logger.info(f"🗣️ Найдены голоса: {voices_val}")
-                        except:
-                            pass
+                    voices_val = extract_voices(msg_text)
+                    if voices_val is not None:
+                        logger.info(f"🗣️ Найдены голоса: {voices_val}")
                 
                 # Проверяем на воскрешение
                 if RE_RESURRECTION_SUCCESS.search(msg_text) or RE_RESURRECTION.search(msg_text):
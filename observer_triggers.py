@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import logging
 import re
+import sys
 import threading
 import time
 from typing import List, Optional
@@ -9,6 +10,35 @@ from .custom_triggers import trigger_store
 
 logger = logging.getLogger(__name__)
 
+# Паттерны ответа игры (компилируются один раз при импорте)
+_RE_TARGET_ID = re.compile(r'\[id(\d+)\|')
+# «на N%» приоритетнее голого «N%» (как в прежнем каскаде из пяти паттернов,
+# где «повышена/увеличена на N%» и «+N%» поглощались первым и четвёртым)
+_RE_PERCENT = re.compile(r"(на\s+)?(\d{1,3})\s*%")
+_RE_LUCK = re.compile(r"удача\s+повышена\s+на\s+(\d{1,3})")
+
+# Ключи бафов Ара/Кир (интернированы: одни и те же объекты во всех словарях)
+KEY_ATTACK, KEY_DEFENSE, KEY_LUCK, KEY_HUMAN, KEY_ELF = map(
+    sys.intern, ('а', 'з', 'у', 'ч', 'э')
+)
+
+# Запрос «всё» → атака, защита, удача
+_ALL_QUERIES = frozenset(('все', 'всего', 'всё'))
+_ALL_BUFF_KEYS = (KEY_ATTACK, KEY_DEFENSE, KEY_LUCK)
+# Бафы, сила которых указана в процентах
+_PERCENT_BUFF_KEYS = frozenset((KEY_ATTACK, KEY_DEFENSE))
+
+
+def _find_percent(text_lower: str) -> Optional[int]:
+    """Процент бафа из ответа игры за один проход по тексту"""
+    fallback = None
+    for m in _RE_PERCENT.finditer(text_lower):
+        if m.group(1):
+            return int(m.group(2))
+        if fallback is None:
+            fallback = int(m.group(2))
+    return fallback
+
 
 class CustomTriggerHandler:
     """Обработчик Ара/Кир с потоком ожидания до 315 секунд"""
@@ -17,64 +47,94 @@ class CustomTriggerHandler:
         self.bot = bot
         self.ARA_ID = 294529251
         self.KIR_ID = 8244449
+        # Префикс команды → исполнитель
+        self._executors = {'ара': self.ARA_ID, 'кир': self.KIR_ID}
         
         # Словарь для маппинга текста в ключи бафов
         self.buff_keywords = {
-            'а': ['атак', '🗡️', 'меч', 'оружи'],
-            'з': ['защит', '🛡️', 'брон', 'щит', 'броня'],
-            'у': ['удач', '🍀', 'везен', 'фортун'],
-            'ч': ['человек', 'людей', '🧍'],
-            'э': ['эльф', '🧝'],
+            KEY_ATTACK: ['атак', '🗡️', 'меч', 'оружи'],
+            KEY_DEFENSE: ['защит', '🛡️', 'брон', 'щит', 'броня'],
+            KEY_LUCK: ['удач', '🍀', 'везен', 'фортун'],
+            KEY_HUMAN: ['человек', 'людей', '🧍'],
+            KEY_ELF: ['эльф', '🧝'],
         }
         
+        # Ключевые слова запроса одним автоматом: группа i ↔ i-й ключ buff_keywords.
+        # Lookahead находит совпадение в каждой позиции текста, поэтому
+        # пересекающиеся слова разных бафов не теряются (ключевые слова разных
+        # бафов не должны быть префиксами друг друга — в одной позиции
+        # засчитывается только одна группа)
+        self._buff_key_order = list(self.buff_keywords)
+        self._buff_key_set = frozenset(self.buff_keywords)
+        self._re_buff_key = re.compile("(?=" + "|".join(
+            "(" + "|".join(map(re.escape, keywords)) + ")"
+            for keywords in self.buff_keywords.values()
+        ) + ")")
+
         # Словарь названий бафов
         self.buff_names = {
-            'а': 'Атака', 'з': 'Защита', 'у': 'Удача', 
-            'ч': 'Человек', 'э': 'Эльф'
+            KEY_ATTACK: 'Атака', KEY_DEFENSE: 'Защита', KEY_LUCK: 'Удача',
+            KEY_HUMAN: 'Человек', KEY_ELF: 'Эльф'
         }
         
         # Словарь эмодзи
         self.buff_emojis = {
-            'а': '🗡️', 'з': '🛡️', 'у': '🍀', 'ч': '🧍', 'э': '🧝'
+            KEY_ATTACK: '🗡️', KEY_DEFENSE: '🛡️', KEY_LUCK: '🍀',
+            KEY_HUMAN: '🧍', KEY_ELF: '🧝'
+        }
+
+        # Готовые хвосты строк уведомления: (buff_key, крит) → «эмодзи]Название +N!»
+        self._notification_tails = {
+            (key, crit): self._notification_tail(key, crit)
+            for key in self.buff_names
+            for crit in (False, True)
         }
 
+    def _notification_tail(self, buff_key: str, is_critical: bool) -> str:
+        emoji = self.buff_emojis.get(buff_key, '✨')
+        return f"{emoji}]{self._format_buff_label(buff_key, is_critical)}"
+
+    def _format_buff_label(self, buff_key: str, is_critical: bool) -> str:
+        """Название бафа со значением — как в обычном бафере"""
+        buff_name = self.buff_names.get(buff_key, 'Баф')
+        if buff_key in _PERCENT_BUFF_KEYS:
+            value = "+30%!🍀" if is_critical else "+20%!"
+            return f"{buff_name} {value}"
+        if buff_key == KEY_LUCK:
+            value = "+9!🍀" if is_critical else "+6!"
+            return f"{buff_name} {value}"
+        return f"{buff_name}!🍀" if is_critical else f"{buff_name}!"
+
     def handle_command(self, text: str, from_id: int) -> bool:
         """Обработка команды от пользователя"""
-        text_lower = text.lower().strip()
-        
-        if text_lower.startswith('ара'):
-            query = text_lower[3:].strip()
-            executor_id = self.ARA_ID
-        elif text_lower.startswith('кир'):
-            query = text_lower[3:].strip()
-            executor_id = self.KIR_ID
-        else:
+        # Префикс проверяем по трём символам, не копируя в нижний регистр
+        # всё сообщение (через этот метод проходит каждая реплика чата)
+        stripped = (text or "").strip()
+        executor_id = self._executors.get(stripped[:3].lower())
+        if executor_id is None:
             return False
+        query = stripped[3:].strip().lower()
 
         # Парсим запрос
         buff_keys = []
         
         # ALL-команда
-        if query in ['все', 'всего', 'всё']:
-            buff_keys = ['а', 'з', 'у']
+        if query in _ALL_QUERIES:
+            buff_keys = list(_ALL_BUFF_KEYS)
         else:
             # Ищем по ключевым словам
-            for key, keywords in self.buff_keywords.items():
-                if any(kw in query for kw in keywords):
-                    if key not in buff_keys:
-                        buff_keys.append(key)
+            buff_keys = self._find_buff_keys(query)
             
             # Если ничего не нашли - ищем по отдельным буквам
             if not buff_keys:
-                for ch in query:
-                    if ch in self.buff_keywords:
-                        buff_keys.append(ch)
+                letters = self._buff_key_set.intersection(query)
+                buff_keys = [key for key in self._buff_key_order if key in letters]
 
         if not buff_keys:
-            logger.warning(f"❌ Не удалось распарсить запрос: '{query}'")
+            logger.warning("❌ Не удалось распарсить запрос: '%s'", query)
             return False
 
-        logger.info(f"🎯 команда для {from_id}: {buff_keys} (исполнитель: {executor_id})")
+        logger.info("🎯 команда для %s: %s (исполнитель: %s)", from_id, buff_keys, executor_id)
 
         # Регистрируем триггер
         trigger_index = trigger_store.register_trigger(from_id, buff_keys, executor_id)
@@ -98,23 +158,23 @@ class CustomTriggerHandler:
             return False
 
         # Ищем ID пользователя
-        match = re.search(r'\[id(\d+)\|', text)
+        match = _RE_TARGET_ID.search(text)
         if not match:
             return False
 
         uid = int(match.group(1))
-        
-        # Определяем тип бафа
+
+        # Большинство ответов игры — обычные /баф без ожидающего триггера:
+        # для них не копируем текст в нижний регистр и не сканируем его
+        if not trigger_store.has_triggers(uid):
+            return False
+
+        # Определяем тип бафа (нижний регистр — один раз на ответ)
         text_lower = text.lower()
-        buff_key = None
-        
-        for key, keywords in self.buff_keywords.items():
-            if any(kw in text_lower for kw in keywords):
-                buff_key = key
-                break
+        buff_key = self._detect_buff_key(text_lower)
 
         if not buff_key:
-            logger.debug(f"❌ Не удалось определить тип бафа в тексте")
+            logger.debug("❌ Не удалось определить тип бафа в тексте")
             return False
 
         # Определяем критичность и значение
@@ -122,29 +182,15 @@ class CustomTriggerHandler:
         buff_value = 150 if is_critical else 100
         
         # Для атаки/защиты проверяем проценты
-        if buff_key in ['а', 'з']:
-            percent_patterns = [
-                r"на\s+(\d{1,3})\s*%",
-                r"повышена\s+на\s+(\d{1,3})\s*%",
-                r"увеличена\s+на\s+(\d{1,3})\s*%",
-                r"(\d{1,3})\s*%",
-                r"\+(\d{1,3})%"
-            ]
-            for pattern in percent_patterns:
-                match = re.search(pattern, text_lower)
-                if match:
-                    try:
-                        percent = int(match.group(1))
-                        if percent >= 30:
-                            is_critical = True
-                            buff_value = 150
-                        break
-                    except:
-                        pass
+        if buff_key in _PERCENT_BUFF_KEYS:
+            percent = _find_percent(text_lower)
+            if percent is not None and percent >= 30:
+                is_critical = True
+                buff_value = 150
         
         # Для удачи проверяем единицы
-        elif buff_key == 'у':
-            luck_match = re.search(r"удача\s+повышена\s+на\s+(\d{1,3})", text_lower)
+        elif buff_key == KEY_LUCK:
+            luck_match = _RE_LUCK.search(text_lower)
             if luck_match:
                 try:
                     luck_val = int(luck_match.group(1))
@@ -154,7 +200,7 @@ class CustomTriggerHandler:
                 except:
                     pass
 
-        logger.info(f"📩 Ответ игры для {uid}: баф {buff_key}, крит={is_critical}, значение={buff_value}")
+        logger.info("📩 Ответ игры для %s: баф %s, крит=%s, значение=%s", uid, buff_key, is_critical, buff_value)
 
         # Ищем активный триггер для этого пользователя
         # В реальности нужно найти правильный индекс, но для простоты будем считать
@@ -167,109 +213,98 @@ class CustomTriggerHandler:
 
         return True
 
+    def _find_buff_keys(self, query: str) -> List[str]:
+        """Все бафы, упомянутые в запросе, в порядке buff_keywords"""
+        found = {m.lastindex for m in self._re_buff_key.finditer(query)}
+        return [self._buff_key_order[i - 1] for i in sorted(found)]
+
+    def _detect_buff_key(self, text_lower: str) -> Optional[str]:
+        """
+        Тип бафа по ключевым словам.
+        При нескольких совпадениях побеждает ключ, раньше объявленный в buff_keywords.
+        """
+        # Подстроки, а не _re_buff_key: `in` ищет литерал быстрым поиском в C,
+        # а lookahead-альтернация пробуется в каждой позиции длинного ответа игры
+        for key, keywords in self.buff_keywords.items():
+            if any(kw in text_lower for kw in keywords):
+                return key
+        return None
+
     def _wait(self, uid: int, need: int, trigger_index: int):
         """
         Ожидание ответов от игры.
         - Максимум 315 секунд
-        - Проверка каждые 5 секунд
+        - Поток спит до нового ответа (без опроса), прогресс в лог каждые 5 секунд
         - При сборе всех бафов - немедленная отправка
         - При таймауте - отправка того, что успели собрать
         """
         max_wait = 315  # 5 минут + 15 секунд запаса
-        waited = 0
-        interval = 0.5
         check_interval = 5
-        last_check = 0
-        notification_sent = False
-
-        logger.info(f"⏳ Начато ожидание {need} бафов для user_id={uid} (триггер #{trigger_index}), макс. {max_wait}с")
-
-        while waited < max_wait and not notification_sent:
-            time.sleep(interval)
-            waited += interval
-            now = time.time()
-
-            # Проверяем каждые 5 секунд
-            if now - last_check >= check_interval:
-                last_check = now
-                
-                trigger = trigger_store.get_trigger(uid, trigger_index)
-                
-                if not trigger:
-                    logger.debug(f"ℹ️ Триггер #{trigger_index} для {uid} уже завершен")
-                    return
-
-                received = len(trigger['responses'])
-                logger.info(f"⏳ Ожидание бафов для {uid}: {received}/{need} (прошло {waited:.0f}с)")
-                
-                # Если собрали все - немедленно отправляем
-                if received >= need:
-                    logger.info(f"✅ Все {need} ответов получены для {uid} (через {waited:.0f}с)")
-                    self._send_notification(uid, trigger_index)
-                    notification_sent = True
-                    break
+        started = time.monotonic()
+        deadline = started + max_wait
 
-        # Таймаут - отправляем то, что успели собрать
-        if not notification_sent:
-            logger.warning(f"⏰ Таймаут {max_wait}с для user_id={uid}, проверяем собранные бафы")
-            
-            trigger = trigger_store.get_trigger(uid, trigger_index)
-            
-            if trigger and trigger['responses']:
-                received = len(trigger['responses'])
-                logger.info(f"📤 Отправка по таймауту для {uid}: получено {received}/{need}")
+        logger.info("⏳ Начато ожидание %s бафов для user_id=%s (триггер #%s), макс. %sс", need, uid, trigger_index, max_wait)
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            received = trigger_store.wait_for_responses(
+                uid, trigger_index, need, min(check_interval, remaining)
+            )
+            waited = time.monotonic() - started
+
+            if received is None:
+                logger.debug("ℹ️ Триггер #%s для %s уже завершен", trigger_index, uid)
+                return
+
+            # Если собрали все - немедленно отправляем
+            if received >= need:
+                logger.info("✅ Все %s ответов получены для %s (через %.0fс)", need, uid, waited)
                 self._send_notification(uid, trigger_index)
-            else:
-                logger.info(f"🔇 Триггер #{trigger_index} для {uid} без ответов, ничего не отправляем")
-                trigger_store.complete_trigger(uid, trigger_index)
+                return
+
+            logger.info("⏳ Ожидание бафов для %s: %s/%s (прошло %.0fс)", uid, received, need, waited)
+
+        # Таймаут - отправляем то, что успели собрать
+        logger.warning("⏰ Таймаут %sс для user_id=%s, проверяем собранные бафы", max_wait, uid)
+
+        received = trigger_store.count_responses(uid, trigger_index)
+
+        if received:
+            logger.info("📤 Отправка по таймауту для %s: получено %s/%s", uid, received, need)
+            self._send_notification(uid, trigger_index)
+        else:
+            logger.info("🔇 Триггер #%s для %s без ответов, ничего не отправляем", trigger_index, uid)
+            trigger_store.complete_trigger(uid, trigger_index)
 
     def _send_notification(self, user_id: int, trigger_index: int):
         """Отправляет уведомление для конкретного триггера"""
         responses = trigger_store.get_responses(user_id, trigger_index)
         
         if not responses:
-            logger.warning(f"⚠️ Нет данных для уведомления user_id={user_id}, триггер #{trigger_index}")
+            logger.warning("⚠️ Нет данных для уведомления user_id=%s, триггер #%s", user_id, trigger_index)
             return
 
         # Формируем уведомление
+        tails = self._notification_tails
         lines = ["🎉 Баф успешно выдан!"]
-        total_cost = 0
-
-        for buff_key, executor_id, is_critical, buff_value in responses:
-            executor_link = f"[https://vk.ru/id{executor_id}|{self.buff_emojis.get(buff_key, '✨')}]"
-            buff_name = self.buff_names.get(buff_key, 'Баф')
-
-            # Форматируем как в обычном бафере
-            if buff_key in ['а', 'з']:
-                if is_critical:
-                    value = f"+30%!🍀"
-                else:
-                    value = f"+20%!"
-                line = f"{executor_link}{buff_name} {value}"
-            elif buff_key == 'у':
-                if is_critical:
-                    value = f"+9!🍀"
-                else:
-                    value = f"+6!"
-                line = f"{executor_link}{buff_name} {value}"
-            else:
-                if is_critical:
-                    line = f"{executor_link}{buff_name}!🍀"
-                else:
-                    line = f"{executor_link}{buff_name}!"
-
-            lines.append(line)
-            total_cost += buff_value
-
+        lines += [
+            f"[https://vk.ru/id{executor_id}|"
+            f"{tails.get((buff_key, is_critical)) or self._notification_tail(buff_key, is_critical)}"
+            for buff_key, executor_id, is_critical, _ in responses
+        ]
+        total_cost = sum(buff_value for _, _, _, buff_value in responses)
         lines.append(f"[https://vk.ru/id{user_id}|💰]Списано {total_cost} баллов")
         notif = "\n".join(lines)
 
         # Отправляем
         try:
             self.bot.send_to_peer(self.bot.source_peer_id, notif)
-            logger.info(f"📤 Уведомление отправлено для {user_id} (триггер #{trigger_index}, бафов: {len(responses)})")
+            logger.info("📤 Уведомление отправлено для %s (триггер #%s, бафов: %s)", user_id, trigger_index, len(responses))
         except Exception as e:
-            logger.error(f"❌ Ошибка отправки: {e}")
+            logger.error("❌ Ошибка отправки: %s", e)
 
         # Удаляем триггер
         trigger_store.complete_trigger(user_id, trigger_index)
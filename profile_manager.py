@@ -23,6 +23,7 @@ import threading
 import time
 from typing import Any, Dict, List, Optional
 
+from .constants import RACE_TEXT_TO_KEY
 from .regexes import RE_PROFILE_LEVEL, RE_VOICES_ANY, RE_VOICES_GENERIC
 from .token_handler import TokenHandler
 from .token_manager import OptimizedTokenManager
@@ -284,15 +285,8 @@ class ProfileManager:
 
         # 3) Расы
         text_lower = text.lower()
-        race_mapping = {
-            "человек": "ч", "гоблин": "г", "нежить": "н",
-            "эльф": "э", "гном": "м", "демон": "д", "орк": "о",
-            "людей": "ч", "гоблинов": "г", "нежити": "н",
-            "эльфов": "э", "гномов": "м", "демонов": "д", "орков": "о",
-        }
-
         races: List[str] = []
-        for race_name, race_key in race_mapping.items():
+        for race_name, race_key in RACE_TEXT_TO_KEY.items():
             if race_name in text_lower:
                 races.append(race_key)
 
@@ -1,123 +1,213 @@
 # -*- coding: utf-8 -*-
-import re
-
-# 1. Специфичные ошибки (проверять ПЕРВЫМИ!)
-RE_NOT_APOSTLE_OF_RACE = re.compile(
-    r"🚫.*?вы не являетесь апостолом этой расы!",
-    re.IGNORECASE
-)
-
-RE_ALREADY_BUFF = re.compile(
-    r"🚫.*?на эту цель уже действует такое благословение!",
-    re.IGNORECASE
-)
-
-RE_OTHER_RACE = re.compile(
-    r"🚫.*?на цель уже наложено другое расовое благословение!",
-    re.IGNORECASE
-)
-
-RE_ALREADY_RACE = re.compile(
-    r"🚫.*?нельзя наложить благословение уже имеющейся у цели расы!",
-    re.IGNORECASE
-)
+"""
+Регулярные выражения для разбора ответов игры.
 
-RE_REQUIRES_ANCIENT_VOICE = re.compile(
-    r"требуется Голос Древних",
-    re.IGNORECASE
-)
-
-# 2. Общие ошибки
-RE_NO_VOICES = re.compile(
-    r"(нет голосов|недостаточно голосов|не хватает голосов)",
-    re.IGNORECASE
-)
-
-RE_NOT_APOSTLE = re.compile(
-    r"🚫.*?(ты не апостол|вы не апостол|не являешься апостолом|не являетесь апостолом)",
-    re.IGNORECASE
-)
-
-# ============= ВОСКРЕШЕНИЕ =============
-RE_RESURRECTION = re.compile(
-    r"(?:"
-    r"паладин пытается Вас воскресить|"
-    r"вы воскресили цель|"
-    r"воскрешение прошло успешно|"
-    r"цель воскрешена|"
-    r"воскрешение"
-    r")",
-    re.IGNORECASE
-)
-
-RE_RESURRECTION_SUCCESS = re.compile(
-    r"(?:"
-    r"паладин пытается Вас воскресить! Результаты действия можно найти в диалоге с игрой\."
-    r")",
-    re.IGNORECASE | re.DOTALL
-)
-# =======================================
-
-# ============= ОЧИЩЕНИЕ =============
-RE_CLEANSE = re.compile(
-    r"(?:"
-    r"очищение огнем|"
-    r"очищение светом|"
-    r"сняты? проклятия?|"
-    r"вы очистили цель"
-    r")",
-    re.IGNORECASE
-)
-# ====================================
-
-# 3. Успех (по ключевым фразам успешного действия)
-RE_SUCCESS = re.compile(
-    r"(?:"
-    r"на (?:вас|вас|цель) (?:наложено|снято)|"
-    r"снята (?:одна|\d+) травма|"
-    r"(?:благословение|проклятие|очищение) (?:наложено|снято)|"
-    r"успешно (?:наложено|снято|применено)|"
-    r"получено.*?увеличение|"
-    r"вам выдано.*?благословение|"
-    r"цель получила.*?баф|"
-    r"(?:атака|защита|удача|броня|урон).*?(?:повышена|увеличена)"
-    r")",
-    re.IGNORECASE
-)
-
-# 4. Уже/КД
-RE_ALREADY = re.compile(
-    r"🚫.*?(уже действует|уже наложен|уже получала)",
-    re.IGNORECASE
-)
-
-RE_COOLDOWN = re.compile(
-    r"(социальные эффекты.*только через определенное время|можно накладывать только через определенное время|подождите.*сек)",
-    re.IGNORECASE | re.DOTALL
-)
-
-# 5. Технические
-RE_REMAINING_SEC = re.compile(
-    r"(?:оставшееся\s*время\s*:\s*)(\d+)\s*(?:сек|сек\.|с)\b",
-    re.IGNORECASE | re.DOTALL
-)
-
-RE_VOICES_GENERIC = re.compile(
-    r"🗣️?\s*Голос\s*у\s*(?:Апостола|проклинающего|Паладина)\s*[:]?\s*(\d+)",
-    re.IGNORECASE
-)
-
-RE_VOICES_ANY = re.compile(
-    r"🗣️?\s*(?:Голос|голоса)\s*[:]?\s*(\d+)",
-    re.IGNORECASE
-)
-
-RE_VOICES_IN_PARENTHESES = re.compile(
-    r"\((\d+)\)",
-    re.IGNORECASE
-)
-
-RE_PROFILE_LEVEL = re.compile(
-    r"(?:уровень|lvl)\s*[: ]\s*(\d+)",
-    re.IGNORECASE
-)
+Паттерны компилируются лениво при первом обращении к RE_* (PEP 562),
+поэтому импорт модуля не компилирует то, что процессу не нужно.
+"""
+import re
+from typing import Dict, Optional, Pattern, Tuple
+
+_PATTERNS: Dict[str, Tuple[str, int]] = {
+    # 1. Специфичные ошибки (проверять ПЕРВЫМИ!)
+    "RE_NOT_APOSTLE_OF_RACE": (
+        r"🚫.*?вы не являетесь апостолом этой расы!",
+        re.IGNORECASE,
+    ),
+
+    "RE_ALREADY_BUFF": (
+        r"🚫.*?на эту цель уже действует такое благословение!",
+        re.IGNORECASE,
+    ),
+
+    "RE_OTHER_RACE": (
+        r"🚫.*?на цель уже наложено другое расовое благословение!",
+        re.IGNORECASE,
+    ),
+
+    "RE_ALREADY_RACE": (
+        r"🚫.*?нельзя наложить благословение уже имеющейся у цели расы!",
+        re.IGNORECASE,
+    ),
+
+    "RE_REQUIRES_ANCIENT_VOICE": (
+        r"требуется Голос Древних",
+        re.IGNORECASE,
+    ),
+
+    # 2. Общие ошибки
+    "RE_NO_VOICES": (
+        r"(нет голосов|недостаточно голосов|не хватает голосов)",
+        re.IGNORECASE,
+    ),
+
+    "RE_NOT_APOSTLE": (
+        r"🚫.*?(ты не апостол|вы не апостол|не являешься апостолом|не являетесь апостолом)",
+        re.IGNORECASE,
+    ),
+
+    # ============= ВОСКРЕШЕНИЕ =============
+    "RE_RESURRECTION": (
+        r"(?:"
+        r"паладин пытается Вас воскресить|"
+        r"вы воскресили цель|"
+        r"воскрешение прошло успешно|"
+        r"цель воскрешена|"
+        r"воскрешение"
+        r")",
+        re.IGNORECASE,
+    ),
+
+    "RE_RESURRECTION_SUCCESS": (
+        r"(?:"
+        r"паладин пытается Вас воскресить! Результаты действия можно найти в диалоге с игрой\."
+        r")",
+        re.IGNORECASE,
+    ),
+    # =======================================
+
+    # ============= ОЧИЩЕНИЕ =============
+    "RE_CLEANSE": (
+        r"(?:"
+        r"очищение огнем|"
+        r"очищение светом|"
+        r"сняты? проклятия?|"
+        r"вы очистили цель"
+        r")",
+        re.IGNORECASE,
+    ),
+    # ====================================
+
+    # 3. Успех (по ключевым фразам успешного действия)
+    "RE_SUCCESS": (
+        r"(?:"
+        r"на (?:вас|цель) (?:наложено|снято)|"
+        r"снята (?:одна|\d+) травма|"
+        r"(?:благословение|проклятие|очищение) (?:наложено|снято)|"
+        r"успешно (?:наложено|снято|применено)|"
+        r"получено.*?увеличение|"
+        r"вам выдано.*?благословение|"
+        r"цель получила.*?баф|"
+        r"(?:атака|защита|удача|броня|урон).*?(?:повышена|увеличена)"
+        r")",
+        re.IGNORECASE,
+    ),
+
+    # 4. Уже/КД
+    "RE_ALREADY": (
+        r"🚫.*?(уже действует|уже наложен|уже получала)",
+        re.IGNORECASE,
+    ),
+
+    "RE_COOLDOWN": (
+        r"(социальные эффекты.*только через определенное время|"
+        r"можно накладывать только через определенное время|"
+        r"подождите.*сек)",
+        re.IGNORECASE | re.DOTALL,
+    ),
+
+    # 5. Технические
+    "RE_REMAINING_SEC": (
+        r"(?:оставшееся\s*время\s*:\s*)(\d+)\s*(?:сек|сек\.|с)\b",
+        re.IGNORECASE,
+    ),
+
+    "RE_VOICES_GENERIC": (
+        r"🗣️?\s*Голос\s*у\s*(?:Апостола|проклинающего|Паладина)\s*[:]?\s*(\d+)",
+        re.IGNORECASE,
+    ),
+
+    "RE_VOICES_ANY": (
+        r"🗣️?\s*(?:Голос|голоса)\s*[:]?\s*(\d+)",
+        re.IGNORECASE,
+    ),
+
+    "RE_VOICES_IN_PARENTHESES": (
+        r"\((\d+)\)",
+        re.IGNORECASE,
+    ),
+
+    "RE_PROFILE_LEVEL": (
+        r"(?:уровень|lvl)\s*[: ]\s*(\d+)",
+        re.IGNORECASE,
+    ),
+}
+
+
+# Порядок проверки статуса ответа игры (порядок ВАЖЕН: специфичные ошибки первыми)
+STATUS_PATTERN_ORDER: Tuple[str, ...] = (
+    "RE_NOT_APOSTLE_OF_RACE",
+    "RE_ALREADY_BUFF",
+    "RE_OTHER_RACE",
+    "RE_ALREADY_RACE",
+    "RE_REQUIRES_ANCIENT_VOICE",
+    "RE_NO_VOICES",
+    "RE_NOT_APOSTLE",
+    "RE_ALREADY",
+    "RE_COOLDOWN",
+    "RE_RESURRECTION_SUCCESS",
+    "RE_RESURRECTION",
+    "RE_CLEANSE",
+    "RE_SUCCESS",
+)
+# Самые короткие фразы статуса — «воскрешение» и «нет голосов»: более
+# короткий текст (эхо команды, «+», смайл) не совпадёт ни с одним паттерном
+_STATUS_MIN_LEN = 11
+
+
+def _get(name: str) -> Pattern[str]:
+    compiled = globals().get(name)
+    return compiled if compiled is not None else __getattr__(name)
+
+
+def classify_response(text: str) -> Optional[str]:
+    """
+    Определяет статус ответа игры.
+
+    Returns:
+        Имя первого паттерна из STATUS_PATTERN_ORDER, который находится
+        в тексте, или None.
+    """
+    if len(text) < _STATUS_MIN_LEN:
+        return None
+    # Отдельные паттерны по порядку: у каждого свой литеральный префикс,
+    # по которому re быстро пропускает текст, — общая альтернация медленнее
+    for name in STATUS_PATTERN_ORDER:
+        if _get(name).search(text):
+            return name
+    return None
+
+
+_VOICES_PATTERN_ORDER: Tuple[str, ...] = (
+    "RE_VOICES_GENERIC",
+    "RE_VOICES_ANY",
+    "RE_VOICES_IN_PARENTHESES",
+)
+
+
+def extract_voices(text: str) -> Optional[int]:
+    """
+    Количество голосов из ответа игры.
+
+    Паттерны проверяются по приоритету: «Голос у Апостола: N»,
+    затем «Голос: N», затем «(N)».
+    """
+    for name in _VOICES_PATTERN_ORDER:
+        m = _get(name).search(text)
+        if m:
+            return int(m.group(1))
+    return None
+
+
+def __getattr__(name: str) -> Pattern[str]:
+    try:
+        pattern, flags = _PATTERNS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    compiled = re.compile(pattern, flags)
+    globals()[name] = compiled
+    return compiled
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_PATTERNS))
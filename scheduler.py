@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import logging
 import random
+import sys
 import threading
 import time
 from typing import List, Optional, Tuple, Callable, Any, Dict
@@ -239,6 +240,8 @@ class Scheduler:
             self._q.append((when_ts, job, letter, None))
 
     def _build_ability(self, letter: str) -> Optional[ParsedAbility]:
+        # Ключ способности дальше используется в словарях КД токенов
+        letter = sys.intern(letter)
         for cls in CLASS_ORDER:
             info = build_ability_text_and_cd(cls, letter)
             if info:
@@ -278,7 +281,7 @@ class Scheduler:
         class_data = CLASS_ABILITIES.get(t.class_type)
         if not class_data:
             return False
-        return ability.key in class_data["abilities"]
+        return ability.key in class_data["_letters"]
 
     def _cooldown_wait_seconds(self, t: TokenHandler, ability: ParsedAbility) -> float:
         can_social, rem_social = t.can_use_social()
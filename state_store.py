@@ -10,13 +10,13 @@ import threading
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 
-from .models import Job
+from .models import DATACLASS_SLOTS, Job
 from .job_storage import JobStorage
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class ActiveJobInfo:
     job: Job
     letters: str
@@ -26,7 +26,7 @@ class ActiveJobInfo:
     registration_msg_id: Optional[int] = None
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class BuffResultInfo:
     tokens_info: List[Dict[str, Any]]
     total_value: int
@@ -43,6 +43,8 @@ class JobStateStore:
         self._storage = JobStorage(path=storage_path)
         self._last_cleanup_time = 0
         self.CLEANUP_INTERVAL = 3 * 60 * 60  # 3 часа в секундах
+        # Выставляется по окончании restore_and_enqueue (в том числе при ошибке)
+        self._restored = threading.Event()
 
     def has_active(self, user_id: int) -> bool:
         with self._lock:
@@ -54,6 +56,16 @@ class JobStateStore:
             return info.letters if info else ""
 
     def restore_and_enqueue(self, scheduler) -> None:
+        try:
+            self._restore(scheduler)
+        finally:
+            self._restored.set()
+
+    def wait_restored(self, timeout: Optional[float] = None) -> bool:
+        """Ждёт окончания restore_and_enqueue: до него has_active() не видит сохранённые бафы."""
+        return self._restored.wait(timeout)
+
+    def _restore(self, scheduler) -> None:
         try:
             stored = self._storage.load_all()
         except Exception as e:
@@ -105,6 +117,11 @@ class JobStateStore:
             )
 
             with self._lock:
+                # Страховка: команды ждут wait_restored(), но не затираем баф,
+                # если он всё же зарегистрирован раньше восстановления
+                if user_id in self._active_jobs:
+                    logger.info(f"⏭️ Пропускаем восстановление для user_id={user_id}: уже есть новый баф")
+                    continue
                 self._active_jobs[user_id] = job_info
                 if buff_dict:
                     self._buff_results[user_id] = BuffResultInfo(
@@ -141,6 +158,13 @@ class JobStateStore:
         if restored or skipped_cancelled:
             logger.info(f"📦 Восстановлено активных бафов: {restored}, пропущено отменённых: {skipped_cancelled}")
 
+    def compact(self) -> None:
+        """Свернуть журнал JobStorage в снимок (при штатной остановке)."""
+        try:
+            self._storage.compact()
+        except Exception as e:
+            logger.error(f"❌ Ошибка компактизации хранилища бафов: {e}")
+
     def register_job(self, user_id: int, job: Job, letters: str, cmid: Optional[int]) -> ActiveJobInfo:
         with self._lock:
             info = ActiveJobInfo(
@@ -1316,12 +1316,19 @@ class TelegramAdmin:
             pm_status = f" ({'запущен' if is_running else 'остановлен'})"
         
         files_check = []
-        for f in ["config.json", "jobs.json", "profile_manager_state.json"]:
-            if os.path.exists(f):
-                size = os.path.getsize(f) / 1024
-                mtime = os.path.getmtime(f)
+        # Активные бафы: снимок jobs.json перезаписывается только при
+        # компактизации, текущие изменения идут в журнал jobs.log
+        for f, parts in (
+            ("config.json", ("config.json",)),
+            ("jobs.json", ("jobs.json", "jobs.log")),
+            ("profile_manager_state.json", ("profile_manager_state.json",)),
+        ):
+            existing = [p for p in parts if os.path.exists(p)]
+            if existing:
+                size = sum(os.path.getsize(p) for p in existing) / 1024
+                mtime = max(os.path.getmtime(p) for p in existing)
                 age_hours = (time.time() - mtime) / 3600
-                files_check.append(f"✅ {f} ({size:.1f} KB, изменён {age_hours:.1f} ч назад)")
+                files_check.append(f"✅ {' + '.join(existing)} ({size:.1f} KB, изменён {age_hours:.1f} ч назад)")
             else:
                 files_check.append(f"⚠️ {f} (не найден)")
         
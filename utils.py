@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import functools
 import random
 import time
 from datetime import datetime, timedelta, timezone
@@ -11,9 +12,25 @@ def jitter_sleep() -> None:
     time.sleep(random.uniform(0.10, 0.20))
 
 
+# Длинные тексты (ответы игры и т.п.) не кэшируем, чтобы не засорять кэш
+_NORMALIZE_CACHE_MAX_LEN = 128
+
+
+def _normalize_impl(s: str) -> str:
+    # strip() уже возвращает тот же объект, если обрезать нечего;
+    # lower() всегда создаёт новую строку — пропускаем его для готового текста
+    t = (s or "").strip()
+    return t if t.islower() else t.lower()
+
+
+_normalize_cached = functools.lru_cache(maxsize=4096)(_normalize_impl)
+
+
 def normalize_text(s: str) -> str:
-    """Приведение текста к нормализованному виду."""
-    return (s or "").strip().lower()
+    """Приведение текста к нормализованному виду (короткие строки кэшируются)."""
+    if s and len(s) > _NORMALIZE_CACHE_MAX_LEN:
+        return _normalize_impl(s)
+    return _normalize_cached(s)
 
 
 def now_ts() -> int: